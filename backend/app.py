@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import logging
 
 # =============================================================================
@@ -35,7 +36,12 @@ from typing import Optional
 from middleware.clerk_auth import get_current_user, require_auth
 
 # Core AI service
-from services.ai_service import generate_post_with_ai
+from services.ai_service import (
+    generate_post_with_ai,
+    generate_post_with_ai_async,
+    generate_posts_batch,
+    warm_groq_connection,
+)
 
 # GitHub service
 from services.github_activity import get_user_activity, get_repo_details
@@ -213,11 +219,21 @@ async def startup():
     """Initialize database connection pool and create tables."""
     await connect_db()
     await init_tables()
+    # Handshake with Groq in the background so the first post skips it; the handle
+    # is kept on app.state so shutdown can cancel it
+    app.state.groq_warmup = asyncio.create_task(warm_groq_connection())
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    """Close database connection pool."""
+    """Stop the Groq warmup if it is still running and close the database pool."""
+    warmup = getattr(app.state, "groq_warmup", None)
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+        try:
+            await warmup
+        except asyncio.CancelledError:
+            pass
     await disconnect_db()
 
 # Add CORS middleware
@@ -440,7 +456,7 @@ async def generate_preview(
             # SECURITY: Don't log the actual key, just the error type
             logger.error("Failed to get user settings", exc_info=True)
     
-    post = generate_post_with_ai(req.context, groq_api_key=groq_api_key)
+    post = await generate_post_with_ai_async(req.context, groq_api_key=groq_api_key)
     return {"post": post}
 
 
@@ -460,7 +476,7 @@ async def publish(req: PostRequest):
         except Exception as e:
             logger.error("Failed to get user settings", exc_info=True)
 
-    post = generate_post_with_ai(req.context, groq_api_key=groq_api_key)
+    post = await generate_post_with_ai_async(req.context, groq_api_key=groq_api_key)
     if not post:
         return {"error": "failed_to_generate_post"}
 
@@ -797,6 +813,8 @@ async def disconnect_github(request: DisconnectRequest):
             SET github_access_token = NULL 
             WHERE user_id = $1
         """, [request.user_id])
+        from services.token_store import invalidate_token_cache
+        invalidate_token_cache(user_id=request.user_id)
         
         return {"success": True, "message": "GitHub disconnected"}
     except Exception as e:
@@ -1320,42 +1338,45 @@ async def generate_batch_posts(req: BatchGenerateRequest):
         'curious',            # Question-driven engagement
     ]
     
+    jobs = []
     for idx, activity in enumerate(req.activities):
-        try:
-            # Extract context for AI generation
-            context = activity.get('context', activity)
-            
-            # Use rotating tones for variety - cycle through the array
-            # If user specified a style, use it; otherwise rotate through tones
-            if req.style and req.style != 'standard':
-                post_style = req.style
-            else:
-                post_style = TONE_ROTATION[idx % len(TONE_ROTATION)]
-            
-            # Generate the post with varied tone
-            post_content = generate_post_with_ai(context, groq_api_key=groq_api_key, style=post_style)
-            
-            if post_content:
-                generated_posts.append({
-                    'id': f"post_{idx}_{activity.get('id', '')}",
-                    'activity_id': activity.get('id'),
-                    'activity_type': activity.get('type'),
-                    'activity_title': activity.get('title'),
-                    'content': post_content,
-                    'status': 'pending',
-                    'image_url': None
-                })
-        except Exception as e:
-            logger.error("Error generating post for activity", exc_info=True)
+        # Extract context for AI generation
+        context = activity.get('context', activity)
+        
+        # Use rotating tones for variety - cycle through the array
+        # If user specified a style, use it; otherwise rotate through tones
+        if req.style and req.style != 'standard':
+            post_style = req.style
+        else:
+            post_style = TONE_ROTATION[idx % len(TONE_ROTATION)]
+        jobs.append((context, post_style))
+    
+    # Generate the posts with varied tone, concurrently instead of one Groq
+    # round trip after another (and without blocking the event loop)
+    results = await generate_posts_batch(jobs, groq_api_key=groq_api_key)
+    
+    for idx, (activity, post_content) in enumerate(zip(req.activities, results)):
+        if isinstance(post_content, Exception):
+            logger.error("Error generating post for activity", exc_info=post_content)
             generated_posts.append({
                 'id': f"post_{idx}_{activity.get('id', '')}",
                 'activity_id': activity.get('id'),
                 'activity_type': activity.get('type'),
                 'activity_title': activity.get('title'),
                 'content': None,
-                'error': str(e),
+                'error': str(post_content),
                 'status': 'failed'
             })
+        elif post_content:
+            generated_posts.append({
+                'id': f"post_{idx}_{activity.get('id', '')}",
+                'activity_id': activity.get('id'),
+                'activity_type': activity.get('type'),
+                'activity_title': activity.get('title'),
+                'content': post_content,
+                'status': 'pending',
+                'image_url': None
+            })
     
     return {
         "success": True,
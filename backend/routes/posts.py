@@ -22,9 +22,10 @@ router = APIRouter(tags=["Posts"])
 # SERVICE IMPORTS
 # =============================================================================
 try:
-    from services.ai_service import generate_post_with_ai
+    from services.ai_service import generate_post_with_ai, generate_post_with_ai_async
 except ImportError:
     generate_post_with_ai = None
+    generate_post_with_ai_async = None
 
 try:
     from services.image_service import get_relevant_image
@@ -127,7 +128,7 @@ async def generate_preview(
         except Exception as e:
             print(f"Failed to get user settings: {type(e).__name__}")
     
-    post = generate_post_with_ai(req.context, groq_api_key=groq_api_key)
+    post = await generate_post_with_ai_async(req.context, groq_api_key=groq_api_key)
     return {"post": post}
 
 
@@ -148,7 +149,7 @@ async def publish(req: PostRequest):
         except Exception as e:
             print(f"Failed to get user settings: {e}")
 
-    post = generate_post_with_ai(req.context, groq_api_key=groq_api_key)
+    post = await generate_post_with_ai_async(req.context, groq_api_key=groq_api_key)
     if not post:
         return {"error": "failed_to_generate_post"}
 
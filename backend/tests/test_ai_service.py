@@ -210,6 +210,112 @@ class TestGeneratePostWithAI:
             result = generate_post_with_ai(context, style=style)
             assert result is not None
 
+    def test_groq_client_reused_per_key(self):
+        """The same API key should map to one cached Groq client."""
+        from services.ai_service import get_groq_client
+
+        first = get_groq_client("gsk_reuse_key")
+        second = get_groq_client("gsk_reuse_key")
+        other = get_groq_client("gsk_other_key")
+
+        assert first is second
+        assert first is not other
+
+    @patch('services.ai_service.GROQ_API_KEY', 'test_groq_key')
+    @patch('services.ai_service.client')
+    def test_generate_post_cache_skips_repeat_call(self, mock_client):
+        """With cache=True an identical request should not call Groq again."""
+        from services.ai_service import generate_post_with_ai, get_cache_stats
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Cached post content"
+        mock_client.chat.completions.create.return_value = mock_response
+
+        context = {"type": "push", "commits": 7, "repo": "cache-test-repo"}
+        before = get_cache_stats()
+
+        first = generate_post_with_ai(context, cache=True)
+        second = generate_post_with_ai(context, cache=True)
+
+        assert first == second == "Cached post content"
+        assert mock_client.chat.completions.create.call_count == 1
+        assert get_cache_stats()["hits"] == before["hits"] + 1
+
+    @patch('services.ai_service.GROQ_API_KEY', 'test_groq_key')
+    @patch('services.ai_service.client')
+    def test_generate_post_cache_ignores_unused_context_fields(self, mock_client):
+        """Contexts that render the same prompt should share a cached post."""
+        from services.ai_service import generate_post_with_ai
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Shared post content"
+        mock_client.chat.completions.create.return_value = mock_response
+
+        base = {"type": "push", "commits": 2, "repo": "near-dup-repo"}
+        generate_post_with_ai({**base, "date": "2 hours ago"}, cache=True)
+        generate_post_with_ai({**base, "date": "3 hours ago"}, cache=True)
+        generate_post_with_ai({**base, "commits": 5}, cache=True)
+
+        assert mock_client.chat.completions.create.call_count == 2
+
+    @patch('services.ai_service._client_for_key')
+    def test_generate_post_cache_is_scoped_per_api_key(self, mock_client_for_key):
+        """A cached post for one user's key must not be served to another key."""
+        from services.ai_service import generate_post_with_ai
+
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Tenant post content"
+        create = mock_client_for_key.return_value.chat.completions.create
+        create.return_value = mock_response
+
+        context = {"type": "push", "commits": 4, "repo": "tenant-cache-repo"}
+        generate_post_with_ai(context, groq_api_key="gsk_tenant_a", cache=True)
+        generate_post_with_ai(context, groq_api_key="gsk_tenant_b", cache=True)
+        generate_post_with_ai(context, groq_api_key="gsk_tenant_a", cache=True)
+
+        assert create.call_count == 2
+
+    @patch('services.ai_service.GROQ_API_KEY', 'test_groq_key')
+    @patch('services.ai_service.get_async_groq_client')
+    async def test_generate_posts_batch_keeps_job_order(self, mock_get_client):
+        """Batch generation should return one result per job, in order."""
+        from services.ai_service import generate_posts_batch
+
+        async def fake_create(messages, **kwargs):
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = messages[1]["content"].split("'")[1]
+            return response
+
+        mock_get_client.return_value.chat.completions.create = fake_create
+
+        jobs = [({"type": "push", "commits": 1, "repo": name}, "standard") for name in ("a", "b", "c")]
+        results = await generate_posts_batch(jobs)
+
+        assert results == ["a", "b", "c"]
+
+    @patch('services.ai_service.GROQ_API_KEY', 'test_groq_key')
+    @patch('services.ai_service.client')
+    def test_generate_post_streaming_yields_chunks(self, mock_client):
+        """Streaming generation should yield the content deltas in order."""
+        from services.ai_service import generate_post_streaming
+
+        chunks = []
+        for text in ["Just ", "shipped ", None, "it!"]:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        mock_client.chat.completions.create.return_value = iter(chunks)
+
+        result = "".join(generate_post_streaming({"type": "generic"}))
+
+        assert result == "Just shipped it!"
+        assert mock_client.chat.completions.create.call_args.kwargs["stream"] is True
+
 
 class TestContextFormatting:
     """Tests for how different context types are handled."""
@@ -292,6 +292,90 @@ class TestTokenStore:
         assert result["user_id"] == "clerk_user_123"
 
 
+class TestAuthService:
+    """Tests for LinkedIn OAuth token handling."""
+    
+    async def test_concurrent_refresh_is_single_flight(self):
+        """Concurrent callers for an expiring token should share one refresh."""
+        import asyncio
+        import time
+        from unittest.mock import patch
+        import services.auth_service as auth_service
+        import services.token_store as token_store
+        
+        urn = "urn:li:person:single_flight"
+        store = {urn: {"access_token": "old", "refresh_token": "r1", "expires_at": int(time.time())}}
+        refresh_calls = []
+        
+        async def fake_get_token_by_urn(linkedin_user_urn):
+            await asyncio.sleep(0)
+            return dict(store[linkedin_user_urn])
+        
+        async def fake_save_token(linkedin_user_urn, access_token, refresh_token=None, expires_at=None):
+            store[linkedin_user_urn] = {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "expires_at": expires_at,
+            }
+        
+        def fake_refresh(refresh_token):
+            refresh_calls.append(refresh_token)
+            return {"access_token": "new", "refresh_token": "r2", "expires_at": int(time.time()) + 3600}
+        
+        with patch.object(token_store, "get_token_by_urn", fake_get_token_by_urn), \
+             patch.object(auth_service, "get_token_by_urn", fake_get_token_by_urn), \
+             patch.object(auth_service, "save_token", fake_save_token), \
+             patch.object(auth_service, "refresh_access_token", fake_refresh):
+            tokens = await asyncio.gather(
+                *(auth_service.get_access_token_for_urn(urn) for _ in range(5))
+            )
+        
+        assert tokens == ["new"] * 5
+        assert refresh_calls == ["r1"]
+    
+    async def test_token_lookup_is_cached(self):
+        """Repeated lookups for a valid token should hit the database once."""
+        import time
+        from unittest.mock import patch, AsyncMock
+        import services.auth_service as auth_service
+        import services.token_store as token_store
+        
+        urn = "urn:li:person:cached_lookup"
+        row = {"access_token": "cached", "refresh_token": None, "expires_at": int(time.time()) + 3600}
+        fake_get = AsyncMock(return_value=row)
+        
+        with patch.object(token_store, "get_token_by_urn", fake_get):
+            for _ in range(3):
+                assert await auth_service.get_access_token_for_urn(urn) == "cached"
+        
+        assert fake_get.await_count == 1
+    
+    async def test_deleted_token_is_not_served_from_cache(self):
+        """Disconnecting LinkedIn should evict the cached token immediately."""
+        import time
+        from unittest.mock import patch, AsyncMock, MagicMock
+        import services.auth_service as auth_service
+        import services.token_store as token_store
+        
+        urn = "urn:li:person:deleted_user"
+        row = {
+            "access_token": "soon_deleted",
+            "refresh_token": None,
+            "expires_at": int(time.time()) + 3600,
+            "user_id": "clerk_deleted_user",
+        }
+        fake_get = AsyncMock(side_effect=[row, None])
+        fake_db = MagicMock()
+        fake_db.execute = AsyncMock(return_value=1)
+        
+        with patch.object(token_store, "get_token_by_urn", fake_get), \
+             patch.object(token_store, "get_database", return_value=fake_db):
+            assert await auth_service.get_access_token_for_urn(urn) == "soon_deleted"
+            assert await token_store.delete_token_by_user_id("clerk_deleted_user")
+            with pytest.raises(RuntimeError):
+                await auth_service.get_access_token_for_urn(urn)
+
+
 class TestAIServicePrompts:
     """Tests for AI service prompt generation."""
     
@@ -1,11 +1,21 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import random
-import datetime
+import re
+import signal
+import sqlite3
+import atexit
+from datetime import date, datetime, timedelta, timezone
+import functools
+import hashlib
+import io
 import os
+import sys
+import threading
 import time
-from dateutil import parser
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import quote
 
 # Load .env file for local development
@@ -15,32 +25,19 @@ try:
 except ImportError:
     pass  # dotenv not installed, will use system environment variables
 
-# =============================================================================
-# SERVICE IMPORTS (Multi-tenant ready)
-# These services accept user context parameters for web app usage.
-# For CLI mode (this file), we read from env vars and pass as params.
-# =============================================================================
+# orjson decodes GitHub's event/repo payloads faster than the stdlib; optional
 try:
-    from services.github_activity import (
-        get_user_activity as service_get_user_activity,
-        get_github_stats as service_get_github_stats,
-        get_recent_repo_updates as service_get_recent_repo_updates
-    )
-    from services.ai_service import (
-        generate_post_with_ai as service_generate_post,
-        synthesize_hashtags as service_synthesize_hashtags
-    )
-    from services.linkedin_service import (
-        post_to_linkedin as service_post_to_linkedin,
-        upload_image_to_linkedin as service_upload_image
-    )
-    from services.image_service import (
-        get_relevant_image as service_get_relevant_image
-    )
-    SERVICES_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️  Services not available (running standalone): {e}")
-    SERVICES_AVAILABLE = False
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+# NOTE: The multi-tenant equivalents of these helpers live in services/ and are
+# used by the web backend. They are deliberately NOT imported here: the CLI never
+# calls them, and importing them would build ai_service's prompt tables and a
+# second Groq client on every cron run.
 
 # --- CONFIGURATION (Load from environment variables for security) ---
 # For local testing: create a .env file or set these manually
@@ -63,6 +60,70 @@ MAX_POSTS = int(os.getenv('MAX_POSTS', '999'))  # Process ALL activities found (
 POST_DELAY_SECONDS = int(os.getenv('POST_DELAY_SECONDS', '3600'))  # 1 hour delay between posts
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', '')
 UNSPLASH_ACCESS_KEY = os.getenv('UNSPLASH_ACCESS_KEY', '')  # Optional: for fetching images
+STATE_DB_FILE = os.getenv('STATE_DB_FILE', os.path.expanduser('~/.post_bot.db'))  # GitHub ETag cache, post cache, post history
+AI_CACHE_REUSE_RATE = float(os.getenv('AI_CACHE_REUSE_RATE', '0'))  # Chance to reuse a past post; 0 = always call Groq
+AI_CACHE_MAX_PER_KEY = 50
+AI_CACHE_TTL_DAYS = 30  # Cached posts older than this are pruned (keys are per repo, so unbounded)
+POST_HISTORY_HOOKS = 3  # Recent opening lines fed back to the model to avoid repeats
+POSTED_SENTINEL = os.getenv('POSTED_SENTINEL', os.path.expanduser('~/.postbot_last'))  # Set to '' to allow re-posting
+# NOTE: both files default to the home directory, which a fresh CI runner doesn't
+# keep; .github/workflows/daily-post.yml points them at a directory it carries
+# between runs with actions/cache
+
+# GitHub endpoints for the configured user (built once, reused by every sensor)
+GITHUB_API = "https://api.github.com"
+GITHUB_USER_URL = f"{GITHUB_API}/users/{GITHUB_USERNAME}"
+# Events are read newest-first. Every event from the last 24h is kept (up to
+# MAX_POSTS), so a page must hold a full busy day; 30 is GitHub's default page size
+# and the size the scan always used
+GITHUB_EVENTS_PER_PAGE = 30
+# Further pages are only requested while every event so far is still in the
+# window; 10 pages x 30 is the most the events API will return (300 events)
+GITHUB_EVENTS_MAX_PAGES = 10
+GITHUB_EVENTS_URL = f"{GITHUB_USER_URL}/events?per_page={GITHUB_EVENTS_PER_PAGE}"
+# Versioned media type + gzip so GitHub sends the smaller, stable JSON representation
+GITHUB_HEADERS = {
+    'Accept': 'application/vnd.github+json',
+    'X-GitHub-Api-Version': '2022-11-28',
+    'Accept-Encoding': 'gzip',
+    'User-Agent': 'post-bot',
+}
+GITHUB_REPOS_URL = f"{GITHUB_USER_URL}/repos?per_page=100&type=owner"
+
+# LinkedIn request headers (the token only changes between runs, so build them once)
+LINKEDIN_HEADERS = {
+    'Authorization': f'Bearer {LINKEDIN_ACCESS_TOKEN}',
+    'X-Restli-Protocol-Version': '2.0.0'
+}
+LINKEDIN_JSON_CONTENT = {'Content-Type': 'application/json'}
+# Static parts of every ugcPosts body
+LINKEDIN_AUTHOR = f"urn:li:person:{LINKEDIN_USER_URN}"
+LINKEDIN_PUBLIC_VISIBILITY = {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
+
+# Keep-alive sessions, one per service, so TLS handshakes are paid once per run.
+# GitHub reads are idempotent GETs, so transient 429/5xx get a short backoff-and-retry;
+# its session carries the API headers and token so call sites only add per-request ones.
+GITHUB_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                     allowed_methods=["GET"], respect_retry_after_header=True, raise_on_status=False)
+github_session = requests.Session()
+github_session.headers.update(GITHUB_HEADERS)
+if GITHUB_TOKEN:
+    github_session.headers['Authorization'] = f'token {GITHUB_TOKEN}'
+github_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=GITHUB_RETRY))
+
+# LinkedIn: register -> upload -> post share one pooled connection. Creating a post is
+# not idempotent, so only retry what provably never reached the server: connection
+# failures and 429s (honouring Retry-After). Read errors and 5xx are never retried.
+LINKEDIN_RETRY = Retry(total=3, connect=3, read=0, status=3, backoff_factor=0.5,
+                       status_forcelist=[429], allowed_methods=["POST", "PUT"],
+                       respect_retry_after_header=True, raise_on_status=False)
+linkedin_session = requests.Session()
+linkedin_session.headers.update(LINKEDIN_HEADERS)
+linkedin_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=LINKEDIN_RETRY))
+
+# Unsplash search + image download (different hosts, same pool)
+unsplash_session = requests.Session()
+unsplash_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
 
 # Validate credentials are set
 if not LINKEDIN_ACCESS_TOKEN or not LINKEDIN_USER_URN or not GROQ_API_KEY:
@@ -70,8 +131,30 @@ if not LINKEDIN_ACCESS_TOKEN or not LINKEDIN_USER_URN or not GROQ_API_KEY:
     print("   Set environment variables: LINKEDIN_ACCESS_TOKEN, LINKEDIN_USER_URN, GROQ_API_KEY")
     print("   Or create a .env file in the project directory")
 
-# Initialize Groq client
-client = Groq(api_key=GROQ_API_KEY)
+# Groq client is created on first use: importing the SDK (httpx, pydantic) is the
+# slowest part of startup and runs that exit early never need it
+_groq_client = None
+_groq_client_lock = threading.Lock()
+
+
+def get_groq_client():
+    global _groq_client
+    with _groq_client_lock:  # drafts run on several threads; build the client once
+        if _groq_client is None:
+            from groq import Groq
+            _groq_client = Groq(api_key=GROQ_API_KEY)
+    return _groq_client
+
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+SYSTEM_PROMPT = "You are a LinkedIn post writer. You MUST complete every post you write. Every post MUST end with exactly 15-20 hashtags on the final line. Include @mentions naturally when relevant. NEVER stop mid-sentence or before adding the hashtags."
+# Per-request constants for the main draft call, built once instead of on every call
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+DRAFT_REQUEST_OPTIONS = {"model": GROQ_MODEL, "temperature": 0.7, "stream": True}
+# A 250-350 word post plus its hashtag line is ~500-600 tokens; a tight cap keeps
+# generation time down, with one larger retry if the model actually runs out
+DRAFT_MAX_TOKENS = 650
+DRAFT_RETRY_MAX_TOKENS = 800
 
 # --- LINKEDIN PERSONA (AI Personality) ---
 LINKEDIN_PERSONA = """You are writing LinkedIn posts for Clifford (Darko) Opoku-Sarkodie, a Creative Technologist, Web Developer, and CS Student.
@@ -92,7 +175,7 @@ LINKEDIN POST STRUCTURE:
 2. Body (3-5 sentences): Develop the idea with a specific example or experience
 3. Insight (1-2 sentences): What you learned and why it matters
 4. Call to Action (1 sentence): Engage your network
-5. Hashtags: 8-12 relevant hashtags (new line)
+5. Hashtags: 15-20 relevant hashtags (new line)
 
 WORD COUNT & FORMAT:
 - Target: 200-300 words (1,300-1,600 characters) - LinkedIn's optimal length
@@ -120,32 +203,172 @@ TOPICS:
 - Growing as a dev-designer hybrid
 
 MANDATORY:
-- Include 8-12 hashtags on a new line
 - Posts must feel COMPLETE - no cutting off mid-sentence
 - Balance technical insight with accessibility
 - Share learning, not just achievements"""
 
+# --- LOCAL STATE (SQLite) ---
+# One WAL-mode database holds everything the bot persists between runs. It is
+# opened once, shared with the stats thread under _state_lock, committed after
+# every live post (a killed run must not lose its dedupe records) and again when
+# the process exits.
+_state_db = None
+_state_lock = threading.Lock()
+
+
+def get_state_db():
+    """Open (once) and return the state database. Callers must hold _state_lock."""
+    global _state_db
+    if _state_db is None:
+        _state_db = sqlite3.connect(STATE_DB_FILE, check_same_thread=False)
+        _state_db.execute("PRAGMA journal_mode=WAL")
+        _state_db.execute("PRAGMA synchronous=NORMAL")
+        _state_db.executescript("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY, etag TEXT, body TEXT,
+                fetched_at INTEGER, poll_interval INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS post_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, post TEXT, ts INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_post_cache_key ON post_cache(key);
+            CREATE TABLE IF NOT EXISTS seen_activity (
+                key TEXT PRIMARY KEY, ts INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS post_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, ts TEXT, type TEXT, repo TEXT, post TEXT
+            );
+        """)
+        # Databases from before post_cache rows were timestamped; their rows read
+        # as NULL and are pruned as expired
+        if 'ts' not in {row[1] for row in _state_db.execute("PRAGMA table_info(post_cache)")}:
+            _state_db.execute("ALTER TABLE post_cache ADD COLUMN ts INTEGER")
+        atexit.register(close_state_db)
+    return _state_db
+
+
+def commit_state_db():
+    """Flush pending state writes to disk now instead of waiting for exit."""
+    with _state_lock:
+        if _state_db is None:
+            return
+        try:
+            _state_db.commit()
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not save bot state to {STATE_DB_FILE}: {e}")
+
+
+def close_state_db():
+    """Commit this run's writes and close the state database."""
+    global _state_db
+    with _state_lock:
+        if _state_db is None:
+            return
+        try:
+            _state_db.commit()
+            _state_db.close()
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not save bot state to {STATE_DB_FILE}: {e}")
+        _state_db = None
+
+
+# --- GITHUB HTTP HELPER (ETag cache) ---
+GITHUB_RATE_LIMIT_FLOOR = 10
+_github_rate_limited = False  # set once remaining quota drops below the floor
+
+
+def _check_rate_limit(response):
+    """Stop calling GitHub for the rest of the run once the primary quota is nearly spent."""
+    global _github_rate_limited
+    remaining = response.headers.get('X-RateLimit-Remaining')
+    if remaining is not None and int(remaining) < GITHUB_RATE_LIMIT_FLOOR and not _github_rate_limited:
+        _github_rate_limited = True
+        reset = response.headers.get('X-RateLimit-Reset')
+        when = datetime.fromtimestamp(int(reset)).strftime('%H:%M') if reset else 'later'
+        print(f"⚠️  GitHub rate limit nearly exhausted ({remaining} left, resets {when}) — skipping further GitHub calls")
+
+
+def github_get(url):
+    """GET a GitHub API URL, revalidating against the on-disk ETag cache.
+
+    Returns (status_code, data). A 304 Not Modified is reported as 200 with the
+    cached body - it costs no primary rate limit and skips the download. If the
+    last response asked us to wait (X-Poll-Interval) the network is skipped.
+    """
+    if _github_rate_limited:
+        return 429, None
+    with _state_lock:
+        entry = get_state_db().execute(
+            "SELECT etag, body, fetched_at, poll_interval FROM http_cache WHERE url = ?", (url,)
+        ).fetchone()
+    if entry:
+        etag, body, fetched_at, cached_poll_interval = entry
+        if time.time() < fetched_at + cached_poll_interval:
+            print(f"🔎 GitHub API: GET {url} -> cached (poll interval not elapsed)")
+            return 200, json_loads(body)
+
+    headers = {}
+    if entry:
+        headers['If-None-Match'] = etag
+    response = github_session.get(url, headers=headers, timeout=10)
+    print(f"🔎 GitHub API: GET {url} -> {response.status_code}")
+    if response.status_code == 401 and GITHUB_TOKEN:
+        print("⚠️  GitHub token unauthorized — retrying without token (will use public API)")
+        headers['Authorization'] = None  # drops the session default for this request
+        response = github_session.get(url, headers=headers, timeout=10)
+        print(f"🔎 GitHub API (no auth): GET {url} -> {response.status_code}")
+    _check_rate_limit(response)
+
+    poll_interval = int(response.headers.get('X-Poll-Interval', 0))
+    if response.status_code == 304 and entry:
+        with _state_lock:
+            get_state_db().execute(
+                "UPDATE http_cache SET fetched_at = ?, poll_interval = ? WHERE url = ?",
+                (int(time.time()), poll_interval, url),
+            )
+        return 200, json_loads(body)
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = json_loads(response.content)
+    new_etag = response.headers.get('ETag')
+    if new_etag:
+        with _state_lock:
+            get_state_db().execute(
+                "INSERT OR REPLACE INTO http_cache (url, etag, body, fetched_at, poll_interval) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, new_etag, response.text, int(time.time()), poll_interval),
+            )
+    return 200, data
+
+
+def parse_github_time(ts):
+    """Parse GitHub's ISO-8601 'Z' timestamps into aware UTC datetimes.
+
+    fromisoformat only accepts a literal 'Z' from 3.11, so it is rewritten as +00:00.
+    """
+    return datetime.fromisoformat(ts.replace('Z', '+00:00'))
+
+
+def humanize_delta(seconds: float) -> str:
+    """'N minutes ago' / 'N hours ago' for an age in seconds (at least 1 minute)."""
+    hours = int(seconds // 3600)
+    if hours < 1:
+        minutes = max(1, int(seconds // 60))
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    return f"{hours} hour{'s' if hours != 1 else ''} ago"
+
+
 # --- SENSOR 2: GITHUB STATS CHECKER ---
 def get_github_stats():
     """Fetch GitHub user stats for inspirational posts"""
     print(f"📈 Fetching GitHub stats for {GITHUB_USERNAME}...")
     try:
-        url = f"https://api.github.com/users/{GITHUB_USERNAME}"
-        headers = {}
-        if GITHUB_TOKEN:
-            headers['Authorization'] = f'token {GITHUB_TOKEN}'
-        response = requests.get(url, headers=headers, timeout=10)
-        print(f"🔎 GitHub API: GET {url} -> {response.status_code}")
-        if response.status_code == 401 and headers.get('Authorization'):
-            print("⚠️  GitHub token unauthorized — retrying without token (will use public API)")
-            response = requests.get(url, timeout=10)
-            print(f"🔎 GitHub API (no auth): GET {url} -> {response.status_code}")
-
-        if response.status_code != 200:
+        status, data = github_get(GITHUB_USER_URL)
+        if status != 200:
             print("⚠️  Could not fetch GitHub user info.")
             return None
 
-        data = response.json()
         return {
             'public_repos': data.get('public_repos', 0),
             'followers': data.get('followers', 0),
@@ -169,45 +392,39 @@ def get_latest_github_activity(max_items: int = None):
     print(f"🕵️ Checking GitHub activity for {GITHUB_USERNAME} (up to {max_items})...")
     activities = []
     try:
-        url = f"https://api.github.com/users/{GITHUB_USERNAME}/events"
-        headers = {}
-        if GITHUB_TOKEN:
-            headers['Authorization'] = f'token {GITHUB_TOKEN}'
-        response = requests.get(url, headers=headers, timeout=10)
-        print(f"🔎 GitHub API: GET {url} -> {response.status_code}")
-        if response.status_code == 401 and headers.get('Authorization'):
-            print("⚠️  GitHub token unauthorized — retrying without token (will use public API)")
-            response = requests.get(url, timeout=10)
-            print(f"🔎 GitHub API (no auth): GET {url} -> {response.status_code}")
-
-        if response.status_code != 200:
-            print("No GitHub activity found or API error.")
-            return activities
-
-        events = response.json()
-        now_utc = datetime.datetime.now(datetime.timezone.utc)
-        cutoff = now_utc - datetime.timedelta(hours=24)
-
-        def humanize_delta(ts: datetime.datetime) -> str:
-            delta = now_utc - ts
-            hours = int(delta.total_seconds() // 3600)
-            if hours < 1:
-                minutes = max(1, int(delta.total_seconds() // 60))
-                return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
-            return f"{hours} hour{'s' if hours != 1 else ''} ago"
-
-        for event in events:
+        def iter_events():
+            # Lazy: the loop below stops pulling (and so stops paging) as soon as it
+            # reaches an out-of-window event or has max_items activities
+            for page in range(1, GITHUB_EVENTS_MAX_PAGES + 1):
+                status, events = github_get(f"{GITHUB_EVENTS_URL}&page={page}")
+                if status != 200:
+                    if page == 1:
+                        print("No GitHub activity found or API error.")
+                    return
+                yield from events
+                if len(events) < GITHUB_EVENTS_PER_PAGE:
+                    return
+
+        now_utc = datetime.now(timezone.utc)
+        cutoff = now_utc - timedelta(hours=24)
+        # GitHub's created_at strings are fixed-width UTC ISO-8601, so they sort
+        # lexicographically; compare strings first and only parse kept events
+        cutoff_str = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        for event in iter_events():
             if len(activities) >= max_items:
                 break
+            created_at = event.get('created_at')
+            if not created_at:
+                continue
+            if created_at < cutoff_str:
+                # Events come back newest-first, so everything after this is older too
+                break
             try:
-                event_time = parser.isoparse(event.get('created_at'))
+                event_time = parse_github_time(created_at)
             except Exception:
                 continue
-            if event_time.tzinfo is None:
-                event_time = event_time.replace(tzinfo=datetime.timezone.utc)
-            if event_time < cutoff:
-                continue
-            when_text = humanize_delta(event_time)
+            when_text = humanize_delta((now_utc - event_time).total_seconds())
 
             etype = event.get('type')
             repo_name = event.get('repo', {}).get('name', '')
@@ -220,7 +437,8 @@ def get_latest_github_activity(max_items: int = None):
                     'repo': clean_repo_name,
                     'full_repo': repo_name,
                     'commits': commit_count,
-                    'date': when_text
+                    'date': when_text,
+                    'event_id': event.get('id')
                 })
 
             elif etype == 'PullRequestEvent':
@@ -230,7 +448,8 @@ def get_latest_github_activity(max_items: int = None):
                     'action': action,
                     'repo': clean_repo_name,
                     'full_repo': repo_name,
-                    'date': when_text
+                    'date': when_text,
+                    'event_id': event.get('id')
                 })
 
             elif etype == 'CreateEvent':
@@ -240,7 +459,8 @@ def get_latest_github_activity(max_items: int = None):
                         'type': 'new_repo',
                         'repo': clean_repo_name,
                         'full_repo': repo_name,
-                        'date': when_text
+                        'date': when_text,
+                        'event_id': event.get('id')
                     })
 
         if not activities:
@@ -253,65 +473,143 @@ def get_latest_github_activity(max_items: int = None):
         return []
 
 
+GITHUB_GRAPHQL_URL = f"{GITHUB_API}/graphql"
+RECENT_REPOS_QUERY = """
+query($login: String!) {
+  user(login: $login) {
+    repositories(first: 100, ownerAffiliations: OWNER, orderBy: {field: PUSHED_AT, direction: DESC}) {
+      nodes {
+        name
+        nameWithOwner
+        pushedAt
+        defaultBranchRef { target { ... on Commit { authoredDate } } }
+      }
+    }
+  }
+}
+"""
+
+
+def _graphql(query, variables):
+    """POST a GitHub GraphQL query; returns its 'data' dict, or None on any failure.
+
+    GraphQL always needs a token, so anonymous runs get None without a request.
+    """
+    if not GITHUB_TOKEN or _github_rate_limited:
+        return None
+    resp = github_session.post(GITHUB_GRAPHQL_URL, timeout=10,
+                               json={'query': query, 'variables': variables})
+    print(f"🔎 GitHub GraphQL: POST {GITHUB_GRAPHQL_URL} -> {resp.status_code}")
+    _check_rate_limit(resp)
+    if resp.status_code != 200:
+        return None
+    body = json_loads(resp.content)
+    if body.get('errors'):
+        return None
+    return body.get('data')
+
+
+def _fetch_repos_graphql():
+    """Fetch owned repos with their latest default-branch commit date in one GraphQL call.
+
+    Returns REST-shaped repo dicts (name/full_name/pushed_at) plus 'last_commit_at',
+    or None if GraphQL is unavailable (it needs a token) or the call failed.
+    """
+    data = _graphql(RECENT_REPOS_QUERY, {'login': GITHUB_USERNAME})
+    user = (data or {}).get('user')
+    if not user:
+        return None
+    repos = []
+    for node in user['repositories']['nodes']:
+        target = (node.get('defaultBranchRef') or {}).get('target') or {}
+        repos.append({
+            'name': node['name'],
+            'full_name': node['nameWithOwner'],
+            'pushed_at': node.get('pushedAt'),
+            'last_commit_at': target.get('authoredDate'),
+        })
+    return repos
+
+
+REPO_SCAN_WORKERS = 8  # stays well under GitHub's secondary (concurrency) rate limit
+
+
+def _fetch_latest_commit_times(full_repo):
+    """Latest commit date on a repo's default branch as a 0/1-item list; None on error."""
+    status, commits = github_get(f"{GITHUB_API}/repos/{full_repo}/commits?per_page=1")
+    if status != 200:
+        return None
+    return [c.get('commit', {}).get('author', {}).get('date') for c in commits[:1]]
+
+
 def get_recent_repo_updates():
     """Scan user's repositories and return a recent update (pushed_at) within 24h."""
+    if _github_rate_limited:
+        return None
     print(f"🔎 Scanning repos for recent pushes for {GITHUB_USERNAME}...")
     try:
-        url = f"https://api.github.com/users/{GITHUB_USERNAME}/repos?per_page=100&type=owner"
-        headers = {}
-        if GITHUB_TOKEN:
-            headers['Authorization'] = f'token {GITHUB_TOKEN}'
-        resp = requests.get(url, headers=headers, timeout=10)
-        print(f"🔎 GitHub API: GET {url} -> {resp.status_code}")
-        if resp.status_code != 200:
-            return None
+        url = GITHUB_REPOS_URL
+        # One GraphQL round trip replaces the repo list + one commits call per recent repo
+        repos = _fetch_repos_graphql()
+        if repos is None:
+            status, repos = github_get(url)
+            if status != 200:
+                return None
+        now_utc = datetime.now(timezone.utc)
+        cutoff = now_utc - timedelta(hours=24)
 
-        repos = resp.json()
-        now_utc = datetime.datetime.now(datetime.timezone.utc)
-        cutoff = now_utc - datetime.timedelta(hours=24)
+        cutoff_str = cutoff.strftime('%Y-%m-%dT%H:%M:%SZ')
 
-        recent = []
+        candidates = []
         for r in repos:
             pushed = r.get('pushed_at')
-            if not pushed:
+            # Same fixed-width UTC string compare as the events loop: only parse recent repos
+            if not pushed or pushed < cutoff_str:
                 continue
-            pushed_dt = parser.isoparse(pushed)
-            if pushed_dt.tzinfo is None:
-                pushed_dt = pushed_dt.replace(tzinfo=datetime.timezone.utc)
+            pushed_dt = parse_github_time(pushed)
             if pushed_dt >= cutoff:
-                repo_name = r.get('name')
-                full_repo = r.get('full_name')
-                commit_url = f"https://api.github.com/repos/{full_repo}/commits?per_page=1"
-                c_resp = requests.get(commit_url, headers=headers, timeout=10)
-                if c_resp.status_code == 200:
-                    commits = c_resp.json()
-                    if commits:
-                        commit = commits[0]
-                        commit_time = commit.get('commit', {}).get('author', {}).get('date')
-                        commit_dt = parser.isoparse(commit_time)
-                        if commit_dt.tzinfo is None:
-                            commit_dt = commit_dt.replace(tzinfo=datetime.timezone.utc)
-                        delta = now_utc - commit_dt
-                        hours = int(delta.total_seconds() // 3600)
-                        when_text = f"{hours} hour{'s' if hours != 1 else ''} ago" if hours >= 1 else f"{max(1,int(delta.total_seconds()//60))} minutes ago"
-                        recent.append({
-                            'type': 'push',
-                            'repo': repo_name,
-                            'full_repo': full_repo,
-                            'commits': 1,
-                            'date': when_text
-                        })
-                else:
-                    delta = now_utc - pushed_dt
-                    hours = int(delta.total_seconds() // 3600)
-                    when_text = f"{hours} hour{'s' if hours != 1 else ''} ago" if hours >= 1 else f"{max(1,int(delta.total_seconds()//60))} minutes ago"
+                candidates.append((r, pushed_dt))
+
+        # REST fallback: fetch each candidate's latest commit concurrently (the
+        # GraphQL path already carries it as last_commit_at)
+        commit_times = {}
+        to_fetch = [r['full_name'] for r, _ in candidates if 'last_commit_at' not in r]
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=REPO_SCAN_WORKERS) as pool:
+                futures = {pool.submit(_fetch_latest_commit_times, name): name for name in to_fetch}
+                for fut in as_completed(futures):
+                    commit_times[futures[fut]] = fut.result()
+
+        recent = []
+        for r, pushed_dt in candidates:
+            repo_name = r.get('name')
+            full_repo = r.get('full_name')
+            if 'last_commit_at' in r:
+                times = [r['last_commit_at']] if r['last_commit_at'] else []
+            else:
+                times = commit_times.get(full_repo)
+            if times is not None:
+                if times:
+                    commit_dt = parse_github_time(times[0])
+                    when_text = humanize_delta((now_utc - commit_dt).total_seconds())
                     recent.append({
                         'type': 'push',
                         'repo': repo_name,
                         'full_repo': full_repo,
                         'commits': 1,
-                        'date': when_text
+                        'date': when_text,
+                        'event_id': f"pushed:{r['pushed_at']}"
                     })
+            else:
+                when_text = humanize_delta((now_utc - pushed_dt).total_seconds())
+                recent.append({
+                    'type': 'push',
+                    'repo': repo_name,
+                    'full_repo': full_repo,
+                    'commits': 1,
+                    'date': when_text,
+                    'event_id': f"pushed:{r['pushed_at']}"
+                })
 
         # Sort by pushed_at descending and return all
         recent_sorted = sorted(recent, key=lambda x: x.get('date'), reverse=False)
@@ -320,17 +618,13 @@ def get_recent_repo_updates():
         print(f"⚠️  Error scanning repos: {e}")
         return None
 
-# --- AI BRAIN: GENERATE DYNAMIC CONTENT WITH GROQ ---
-def generate_post_with_ai(context_data):
-    """Use Google Groq to draft a LinkedIn post based on context"""
-    print("🧠 Groq AI is thinking and drafting your post...")
-    
-    try:
-        # Build context prompt based on what triggered the post
-        if isinstance(context_data, dict) and context_data.get('type') == 'push':
-            context_prompt = f"""
-GitHub Activity: User just pushed {context_data['commits']} commit(s) to repo '{context_data['repo']}' {context_data['date']}.
-Repo: https://github.com/{context_data['full_repo']}
+# --- PROMPT TEMPLATES ---
+# One template per trigger type. The persona and GitHub username are spliced in once
+# at import; generate_post_with_ai() only fills the per-activity fields with .format().
+PROMPT_TEMPLATES = {
+    'push': """
+GitHub Activity: User just pushed {commits} commit(s) to repo '{repo}' {date}.
+Repo: https://github.com/{full_repo}
 
 WRITE A COMPLETE LINKEDIN POST - MUST INCLUDE EVERYTHING BELOW:
 
@@ -348,18 +642,14 @@ CRITICAL REQUIREMENTS:
 - Include @mentions naturally in the text when relevant (e.g., shoutout collaborators, tag tech communities)
 - MANDATORY FINAL LINE: exactly 15-20 diverse hashtags covering topic, tech stack, community, career
   (example: #WebDev #JavaScript #React #NodeJS #Code #Design #Tech #Frontend #Backend #UI #UX #Learning #DevCommunity #Growth #Innovation #100DaysOfCode #Coding #Programming #TechCareer #OpenSource)
-- Explicitly include this repo link: https://github.com/{context_data['full_repo']}
+- Explicitly include this repo link: https://github.com/{full_repo}
 - Include 3-4 emojis naturally: 🎨 🚀 💡 ✨
 - Length: 250-350 words TOTAL including hashtags
 - DO NOT stop mid-sentence or before hashtags
-
-{LINKEDIN_PERSONA}
-"""
-        
-        elif isinstance(context_data, dict) and context_data.get('type') == 'pull_request':
-            context_prompt = f"""
-GitHub Activity: User just {context_data['action'].upper()} a pull request on '{context_data['repo']}' {context_data['date']}.
-Repo: https://github.com/{context_data['full_repo']}
+""" + LINKEDIN_PERSONA + "\n",
+    'pull_request': """
+GitHub Activity: User just {action} a pull request on '{repo}' {date}.
+Repo: https://github.com/{full_repo}
 
 WRITE A COMPLETE LINKEDIN POST - MUST INCLUDE EVERYTHING BELOW:
 
@@ -368,24 +658,18 @@ Structure (200-300 words total):
 2. Story (3-4 sentences) - what the PR involved and what surprised/excited you
 3. Lesson (1-2 sentences) - what you learned about teamwork or design
 4. Question (1 sentence) - engage your network
-5. HASHTAGS (8-12 hashtags on separate line, space-separated)
+5. HASHTAGS (final line: 15-20 hashtags, space-separated)
 
 Requirements:
-- Write the FULL post, do NOT cut off early
-- ALWAYS end with hashtags
-- Explicitly include this repo link once in the body: https://github.com/{context_data['full_repo']}
+- Finish the whole post and end with the hashtag line
+- Explicitly include this repo link once in the body: https://github.com/{full_repo}
 - Vary the hook/story wording each run; avoid repeating phrasing or metaphors from prior posts
 - Include 3-4 emojis naturally: 🎨 🚀 💡 ✨
 - Make it conversational and authentic
-- FINISH THE ENTIRE POST before stopping
-
-{LINKEDIN_PERSONA}
-"""
-        
-        elif isinstance(context_data, dict) and context_data.get('type') == 'new_repo':
-            context_prompt = f"""
-GitHub Activity: User just created a new repository called '{context_data['repo']}' {context_data['date']}.
-Repo: https://github.com/{context_data['full_repo']}
+""" + LINKEDIN_PERSONA + "\n",
+    'new_repo': """
+GitHub Activity: User just created a new repository called '{repo}' {date}.
+Repo: https://github.com/{full_repo}
 
 WRITE A COMPLETE LINKEDIN POST - MUST INCLUDE EVERYTHING BELOW:
 
@@ -394,90 +678,195 @@ Structure (200-300 words total):
 2. Story (3-4 sentences) - the problem, inspiration, or challenge
 3. Vision (1-2 sentences) - what's the potential or purpose
 4. Invite (1 sentence) - call for collaboration or feedback
-5. HASHTAGS (8-12 hashtags on separate line, space-separated)
+5. HASHTAGS (final line: 15-20 hashtags, space-separated)
 
 Requirements:
-- Write the FULL post, do NOT cut off early
-- ALWAYS end with hashtags
-- Explicitly include this repo link once in the body: https://github.com/{context_data['full_repo']}
+- Finish the whole post and end with the hashtag line
+- Explicitly include this repo link once in the body: https://github.com/{full_repo}
 - Vary the hook/story wording each run; avoid repeating phrasing or metaphors from prior posts
 - Include 3-4 emojis naturally: 🎨 🚀 💡 ✨
 - Make it conversational and authentic
-- FINISH THE ENTIRE POST before stopping
-
-{LINKEDIN_PERSONA}
-"""
-        
-        elif isinstance(context_data, dict) and context_data.get('type') == 'milestone':
-            stats = context_data
-            context_prompt = f"""
+""" + LINKEDIN_PERSONA + "\n",
+    'milestone': """
 GitHub Milestone: 
-- {stats['public_repos']} public repositories
-- {stats['followers']} followers
-- Location: {stats.get('location', 'Unknown')}
-GitHub profile: https://github.com/{GITHUB_USERNAME}
+- {public_repos} public repositories
+- {followers} followers
+- Location: {location}
+GitHub profile: https://github.com/""" + GITHUB_USERNAME + """
 
 Write a COMPLETE LinkedIn post that MUST include ALL of these:
 1. Reflection (1-2 sentences) - moment of pride/reflection
 2. Journey (3-4 sentences) - key milestones, lessons, growth
 3. Community (1-2 sentences) - thank people who helped
 4. Future (1 sentence) - what's next
-5. CRITICAL: End with EXACTLY 8-12 HASHTAGS on a new line, separated by spaces
+5. CRITICAL: End with EXACTLY 15-20 HASHTAGS on a new line, separated by spaces
 6. Include 3-4 emojis (🎨 🚀 💡 ✨) naturally throughout
 
 Make it 200-300 words. Do NOT cut off mid-sentence.
-
-{LINKEDIN_PERSONA}
-"""
-        
-        else:
-            context_prompt = f"""Write a COMPLETE LINKEDIN POST - MUST INCLUDE EVERYTHING BELOW:
+""" + LINKEDIN_PERSONA + "\n",
+    'generic': """Write a COMPLETE LINKEDIN POST - MUST INCLUDE EVERYTHING BELOW:
 
 Structure (200-300 words total):
 1. Hook (1-2 sentences) - relatable observation about web dev/tech
 2. Insight (3-4 sentences) - share a lesson or perspective
 3. Value (1-2 sentences) - why it matters to others
 4. Question (1 sentence) - engage your network
-5. HASHTAGS (8-12 hashtags on separate line, space-separated)
+5. HASHTAGS (final line: 15-20 hashtags, space-separated)
 
 Requirements:
-- Write the FULL post, do NOT cut off early
-- ALWAYS end with hashtags
+- Finish the whole post and end with the hashtag line
 - Vary the hook/story wording each run; avoid repeating phrasing or metaphors from prior posts
 - Include 3-4 emojis naturally: 🎨 🚀 💡 ✨
 - Make it conversational and authentic
-- FINISH THE ENTIRE POST before stopping
+""" + LINKEDIN_PERSONA + "\n",
+}
+
+@functools.lru_cache(maxsize=64)
+def _build_prompt(ctx_type, repo, full_repo, commits, date, action, public_repos, followers, location):
+    """Fill the template for one trigger; identical triggers reuse the built string."""
+    template = PROMPT_TEMPLATES.get(ctx_type, PROMPT_TEMPLATES['generic'])
+    return template.format(
+        repo=repo, full_repo=full_repo, commits=commits, date=date,
+        action=action.upper() if action else action,
+        public_repos=public_repos, followers=followers, location=location,
+    )
 
-{LINKEDIN_PERSONA}
-"""
-        
-        # Call Groq API with system message emphasizing completion
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a LinkedIn post writer. You MUST complete every post you write. Every post MUST end with exactly 15-20 hashtags on the final line. Include @mentions naturally when relevant. NEVER stop mid-sentence or before adding the hashtags."},
-                {"role": "user", "content": context_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=4000,
+
+# --- AI POST CACHE ---
+def _post_cache_key(context_data):
+    """Canonical signature of a trigger: structurally identical days share a key."""
+    commits = context_data.get('commits') or 0
+    commit_bucket = 0 if commits <= 1 else 1 if commits <= 5 else 2
+    return '|'.join([
+        context_data.get('type') or 'generic',
+        context_data.get('repo') or '',
+        str(commit_bucket),
+        str(date.today().weekday()),
+    ])
+
+
+def get_cached_post(context_data):
+    """Return a past post for this trigger with probability AI_CACHE_REUSE_RATE, else None."""
+    if AI_CACHE_REUSE_RATE <= 0 or random.random() >= AI_CACHE_REUSE_RATE:
+        return None
+    with _state_lock:
+        rows = get_state_db().execute(
+            "SELECT post FROM post_cache WHERE key = ?", (_post_cache_key(context_data),)
+        ).fetchall()
+    return random.choice(rows)[0] if rows else None
+
+
+def remember_post(context_data, post_content):
+    """Store a freshly generated post under its trigger key (capped per key, pruned by age)."""
+    key = _post_cache_key(context_data)
+    now = int(time.time())
+    with _state_lock:
+        db = get_state_db()
+        db.execute("INSERT INTO post_cache (key, post, ts) VALUES (?, ?, ?)", (key, post_content, now))
+        db.execute(
+            "DELETE FROM post_cache WHERE key = ? AND id NOT IN "
+            "(SELECT id FROM post_cache WHERE key = ? ORDER BY id DESC LIMIT ?)",
+            (key, key, AI_CACHE_MAX_PER_KEY),
         )
-        
-        post_content = response.choices[0].message.content.strip()
-
-        # Ensure the model didn't cut off mid-sentence or omit required hashtags
-        def _looks_complete(text: str) -> bool:
-            if not text or len(text.strip()) < 150:
-                return False
-            lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
-            if not lines:
-                return False
-            last = lines[-1]
-            # MUST have hashtags line with 15-20 hashtags
-            tags = [w for w in last.split() if w.startswith('#')]
-            if 15 <= len(tags) <= 20:
-                return True
-            # If no hashtags, it's incomplete
-            return False
+        db.execute("DELETE FROM post_cache WHERE ts IS NULL OR ts < ?", (now - AI_CACHE_TTL_DAYS * 86400,))
+
+
+# --- POST HISTORY ---
+def append_post_history(context_data, post_content):
+    """Record one published post in the history table."""
+    with _state_lock:
+        get_state_db().execute(
+            "INSERT INTO post_history (ts, type, repo, post) VALUES (?, ?, ?, ?)",
+            (datetime.now(timezone.utc).isoformat(), context_data.get('type') or 'generic',
+             context_data.get('repo'), post_content),
+        )
+
+
+def recent_hooks(n=POST_HISTORY_HOOKS):
+    """Opening lines of the last n posts in the history (oldest first)."""
+    with _state_lock:
+        rows = get_state_db().execute(
+            "SELECT post FROM post_history ORDER BY id DESC LIMIT ?", (n,)
+        ).fetchall()
+    hooks = []
+    for (post,) in reversed(rows):
+        first = next((l.strip() for l in (post or '').splitlines() if l.strip()), '')
+        if first:
+            hooks.append(first)
+    return hooks
+
+
+# --- AI BRAIN: GENERATE DYNAMIC CONTENT WITH GROQ ---
+HASHTAG_RE = re.compile(r'#\w+')
+
+
+def looks_complete(text: str) -> bool:
+    """True if the post is substantial and its last line carries 15-20 hashtags.
+
+    A missing or short hashtag line means the model cut off mid-post.
+    """
+    if not text:
+        return False
+    end = text.strip()
+    if len(end) < 150:
+        return False
+    last = end[end.rfind('\n') + 1:]
+    tags = len(HASHTAG_RE.findall(last))
+    return 15 <= tags <= 20
+
+
+def generate_post_with_ai(context_data):
+    """Use Google Groq to draft a LinkedIn post based on context"""
+    cached_post = get_cached_post(context_data)
+    if cached_post:
+        print("♻️  Reusing a cached post for this trigger (AI_CACHE_REUSE_RATE) — skipping Groq")
+        return cached_post
+
+    print("🧠 Groq AI is thinking and drafting your post...")
+    
+    try:
+        # Build context prompt based on what triggered the post
+        ctx = context_data if isinstance(context_data, dict) else {}
+        context_prompt = _build_prompt(
+            ctx.get('type'), ctx.get('repo'), ctx.get('full_repo'), ctx.get('commits'),
+            ctx.get('date'), ctx.get('action'), ctx.get('public_repos'), ctx.get('followers'),
+            ctx.get('location', 'Unknown'),
+        )
+        hooks = recent_hooks()
+        if hooks:
+            context_prompt += "\nAvoid repeating these opening lines from recent posts:\n" + "\n".join(f"- {h}" for h in hooks) + "\n"
+
+        # Call Groq API with system message emphasizing completion
+        client = get_groq_client()
+        messages = [SYSTEM_MESSAGE, {"role": "user", "content": context_prompt}]
+
+        def _stream_draft(max_tokens: int):
+            response = client.chat.completions.create(
+                messages=messages, max_tokens=max_tokens, **DRAFT_REQUEST_OPTIONS,
+            )
+            # Accumulate the streamed chunks; the first token arrives long before the last.
+            # Once a finished line completes the hashtag block the post is done, so stop
+            # reading instead of paying for any trailing tokens.
+            chunks = []
+            finish_reason = None
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta.content
+                if delta:
+                    chunks.append(delta)
+                finish_reason = choice.finish_reason or finish_reason
+                if delta and delta.endswith('\n') and looks_complete(''.join(chunks)):
+                    response.close()
+                    finish_reason = 'stop'
+                    break
+            return ''.join(chunks).strip(), finish_reason
+
+        post_content, finish_reason = _stream_draft(DRAFT_MAX_TOKENS)
+        if finish_reason == 'length':
+            print(f"⚠️  Draft hit the {DRAFT_MAX_TOKENS}-token cap — retrying once with {DRAFT_RETRY_MAX_TOKENS}")
+            post_content, _ = _stream_draft(DRAFT_RETRY_MAX_TOKENS)
 
         def _attempt_finish(current_text: str, tries: int = 2) -> str:
             for attempt in range(tries):
@@ -494,23 +883,18 @@ Requirements:
                             return current_text  # Already complete
                     
                     # Determine what's missing
-                    if not has_hashtags and current_text.strip().endswith(('.', '!', '?')):
-                        # Complete sentence but no hashtags - just add hashtags
-                        cont_prompt = (
-                            "The LinkedIn post below is complete but missing the required hashtags. "
-                            "Output ONLY a line with exactly 15-20 relevant diverse hashtags (space-separated). "
-                            "Include hashtags for: topic, tech stack, community tags, career tags. "
-                            "Format: #Tag1 #Tag2 #Tag3 etc.\n\nPOST:\n" + current_text
-                        )
-                    else:
-                        # Incomplete - need to finish the thought AND add hashtags
-                        cont_prompt = (
-                            "The LinkedIn post below is incomplete. Continue it briefly (1-2 sentences max), "
-                            "then on a NEW LINE add exactly 15-20 relevant diverse hashtags.\n\nPOST SO FAR:\n" + current_text
-                        )
+                    if (not has_hashtags and len(current_text.strip()) >= 150
+                            and current_text.strip().endswith(('.', '!', '?'))):
+                        # Complete body, just no hashtags: build the line locally, no Groq call
+                        return current_text.rstrip() + "\n\n" + synthesize_hashtags(current_text, desired=18)
+                    # Incomplete - need to finish the thought AND add hashtags
+                    cont_prompt = (
+                        "The LinkedIn post below is incomplete. Continue it briefly (1-2 sentences max), "
+                        "then on a NEW LINE add exactly 15-20 relevant diverse hashtags.\n\nPOST SO FAR:\n" + current_text
+                    )
                     
                     resp = client.chat.completions.create(
-                        model="llama-3.3-70b-versatile",
+                        model=GROQ_MODEL,
                         messages=[{"role": "user", "content": cont_prompt}],
                         temperature=0.6,
                         max_tokens=500,
@@ -525,7 +909,7 @@ Requirements:
                         # Append the continuation
                         current_text = current_text.rstrip() + "\n\n" + addition
                     
-                    if _looks_complete(current_text):
+                    if looks_complete(current_text):
                         return current_text
                 except Exception as e:
                     print(f"⚠️  Error attempting to finish truncated post: {e}")
@@ -535,15 +919,15 @@ Requirements:
             if not current_text.strip().endswith(('.', '!', '?')):
                 current_text = current_text.rstrip() + '.'
             # Use our synthesized hashtags
-            from bot import synthesize_hashtags
             hashtags_line = synthesize_hashtags(current_text, desired=10)
             current_text = current_text.rstrip() + "\n\n" + hashtags_line
             return current_text
 
-        if not _looks_complete(post_content):
+        if not looks_complete(post_content):
             print("⚠️  Generated post appears incomplete — requesting continuation...")
             post_content = _attempt_finish(post_content, tries=2)
 
+        remember_post(context_data, post_content)
         return post_content
         
     except Exception as e:
@@ -552,68 +936,121 @@ Requirements:
         return None
 
 # --- IMAGE FUNCTIONS ---
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Unsplash "regular" renders are well under this
+
+# Image search terms by content category, highest priority first. Every term
+# favours images with code/work visible on screen.
+IMAGE_SEARCH_TERMS = (
+    (('ui', 'ux', 'design', 'interface', 'beautiful', 'aesthetic'), (
+        'designer working on ui design screen',
+        'web design code on monitor',
+        'figma interface on laptop screen',
+        'graphic design software screen'
+    )),
+    (('react', 'javascript', 'frontend', 'web app', 'website'), (
+        'javascript code on laptop screen',
+        'react code visible on monitor',
+        'web developer coding javascript',
+        'frontend code on computer display'
+    )),
+    (('github', 'commit', 'code', 'repository', 'project'), (
+        'github code visible on screen',
+        'programming code displayed on laptop',
+        'developer viewing code on monitor',
+        'coding project on computer screen'
+    )),
+    (('learn', 'student', 'study', 'journey', 'grow'), (
+        'student coding with code on screen',
+        'learning programming laptop display',
+        'studying code on computer monitor',
+        'person learning to code display'
+    )),
+    (('team', 'collaborate', 'community', 'together'), (
+        'developers working code on screens',
+        'team programming computers display',
+        'programmers pair coding screen',
+        'developers collaboration code visible'
+    )),
+    (('build', 'create', 'creative', 'innovation'), (
+        'developer building app code screen',
+        'programmer creating software display',
+        'coding website project screen',
+        'software development code visible'
+    )),
+)
+DEFAULT_IMAGE_SEARCH_TERMS = (
+    'code on laptop screen close up',
+    'programming code visible display',
+    'developer working code monitor',
+    'software engineer coding screen',
+    'html css code on screen',
+    'python code on laptop display'
+)
+
+HASHTAG_KEYWORDS = {
+    'design': '#Design', 'ui': '#UI', 'ux': '#UX', 'frontend': '#Frontend',
+    'react': '#React', 'javascript': '#JavaScript', 'python': '#Python', 'node': '#NodeJS',
+    'automation': '#Automation', 'bot': '#Bot', 'ai': '#AI', 'ml': '#MachineLearning',
+    'open source': '#OpenSource', 'opensource': '#OpenSource', 'web': '#WebDevelopment',
+    'learning': '#Learning', 'student': '#Student', 'career': '#Career', 'product': '#Product',
+    'backend': '#Backend', 'api': '#API', 'database': '#Database', 'cloud': '#Cloud',
+    'github': '#GitHub', 'code': '#Code', 'coding': '#Coding', 'css': '#CSS', 'html': '#HTML'
+}
+DEFAULT_HASHTAGS = (
+    '#WebDev', '#100DaysOfCode', '#Coding', '#Developer', '#Tech', '#Programming',
+    '#Growth', '#Creativity', '#DevCommunity', '#TechCareer', '#Innovation',
+    '#BuildInPublic', '#LearnInPublic', '#SoftwareEngineering', '#CodeNewbie',
+    '#TechTwitter', '#DeveloperLife', '#OpenSource', '#CodingLife', '#WebDesign'
+)
+
+
+def _keyword_regex(keywords):
+    """One alternation matching any keyword at the start of a word (longest first)."""
+    return re.compile(r'\b(' + '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + ')')
+
+
+IMAGE_KEYWORD_CATEGORY = {kw: i for i, (kws, _) in enumerate(IMAGE_SEARCH_TERMS) for kw in kws}
+IMAGE_KEYWORD_RE = _keyword_regex(IMAGE_KEYWORD_CATEGORY)
+HASHTAG_KEYWORD_RE = _keyword_regex(HASHTAG_KEYWORDS)
+
+
+def daily_rng():
+    """Return a PRNG seeded from today's date.
+
+    Re-runs on the same day make the same picks, which keeps retries
+    reproducible and lets tests avoid patching `random`.
+    """
+    return random.Random(int(date.today().strftime('%Y%m%d')))
+
+
+# One generator per run, drawn from in order, so successive images in a run get
+# different search terms (a fresh daily_rng() per call would repeat its first pick)
+image_rng = daily_rng()
+
+
+def image_hint_from_context(context_data):
+    """Keyword text for picking an image before the post is written, or None.
+
+    Only activity posts carry a repo name; it is matched against the same keyword
+    categories as post text (e.g. 'portfolio-design' -> design images).
+    """
+    repo = context_data.get('repo') if isinstance(context_data, dict) else None
+    if not repo:
+        return None
+    return f"{re.sub(r'[-_.]+', ' ', repo)} github project"
+
+
 def get_relevant_image(post_content):
-    """Fetch a relevant image from Unsplash based on post content"""
+    """Fetch a relevant image from Unsplash based on post content (or a context hint)"""
     if not UNSPLASH_ACCESS_KEY:
         print("ℹ️  No Unsplash API key set, skipping image fetch")
         return None
     
-    # Analyze post content for better image matching (Creative Technologist theme)
-    content_lower = post_content.lower()
-    
-    # Prioritize images with CODE VISIBLE on screens - more engaging and relevant
-    if any(word in content_lower for word in ['ui', 'ux', 'design', 'interface', 'beautiful', 'aesthetic']):
-        search_term = random.choice([
-            'designer working on ui design screen',
-            'web design code on monitor',
-            'figma interface on laptop screen',
-            'graphic design software screen'
-        ])
-    elif any(word in content_lower for word in ['react', 'javascript', 'frontend', 'web app', 'website']):
-        search_term = random.choice([
-            'javascript code on laptop screen',
-            'react code visible on monitor',
-            'web developer coding javascript',
-            'frontend code on computer display'
-        ])
-    elif any(word in content_lower for word in ['github', 'commit', 'code', 'repository', 'project']):
-        search_term = random.choice([
-            'github code visible on screen',
-            'programming code displayed on laptop',
-            'developer viewing code on monitor',
-            'coding project on computer screen'
-        ])
-    elif any(word in content_lower for word in ['learn', 'student', 'study', 'journey', 'grow']):
-        search_term = random.choice([
-            'student coding with code on screen',
-            'learning programming laptop display',
-            'studying code on computer monitor',
-            'person learning to code display'
-        ])
-    elif any(word in content_lower for word in ['team', 'collaborate', 'community', 'together']):
-        search_term = random.choice([
-            'developers working code on screens',
-            'team programming computers display',
-            'programmers pair coding screen',
-            'developers collaboration code visible'
-        ])
-    elif any(word in content_lower for word in ['build', 'create', 'creative', 'innovation']):
-        search_term = random.choice([
-            'developer building app code screen',
-            'programmer creating software display',
-            'coding website project screen',
-            'software development code visible'
-        ])
-    else:
-        # Default: ALWAYS prioritize code/work visible on screen
-        search_term = random.choice([
-            'code on laptop screen close up',
-            'programming code visible display',
-            'developer working code monitor',
-            'software engineer coding screen',
-            'html css code on screen',
-            'python code on laptop display'
-        ])
+    # Analyze post content for better image matching (Creative Technologist theme):
+    # one regex pass finds every keyword, and the highest-priority category wins
+    found = {IMAGE_KEYWORD_CATEGORY[kw] for kw in IMAGE_KEYWORD_RE.findall(post_content.lower())}
+    terms = IMAGE_SEARCH_TERMS[min(found)][1] if found else DEFAULT_IMAGE_SEARCH_TERMS
+    search_term = image_rng.choice(terms)
     
     print(f"🖼️  Searching for image: '{search_term}'...")
     
@@ -623,7 +1060,7 @@ def get_relevant_image(post_content):
         headers = {
             'Authorization': f'Client-ID {UNSPLASH_ACCESS_KEY}'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = unsplash_session.get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -634,14 +1071,22 @@ def get_relevant_image(post_content):
             print(f"✅ Found image: {image_description}")
             print(f"   Downloading...")
             
-            # Download image content
-            img_response = requests.get(image_download_url, timeout=10)
-            if img_response.status_code == 200:
-                print(f"✅ Image downloaded successfully ({len(img_response.content)} bytes)")
-                return img_response.content  # Return binary data instead of URL
-            else:
-                print(f"⚠️  Failed to download image: {img_response.status_code}")
-                return None
+            # Stream the image into one buffer, giving up early on oversized files
+            with unsplash_session.get(image_download_url, timeout=10, stream=True) as img_response:
+                if img_response.status_code != 200:
+                    print(f"⚠️  Failed to download image: {img_response.status_code}")
+                    return None
+                buf = io.BytesIO()
+                for chunk in img_response.iter_content(chunk_size=64 * 1024):
+                    buf.write(chunk)
+                    if buf.tell() > MAX_IMAGE_BYTES:
+                        print(f"⚠️  Image larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB — skipping")
+                        return None
+            # Hand back the buffer itself (rewound) rather than a getvalue() copy:
+            # requests sizes it for Content-Length and streams it to LinkedIn
+            print(f"✅ Image downloaded successfully ({buf.tell()} bytes)")
+            buf.seek(0)
+            return buf
         else:
             print(f"⚠️  Unsplash API error: {response.status_code}")
             if response.status_code == 403:
@@ -657,54 +1102,22 @@ def get_relevant_image(post_content):
 
 def synthesize_hashtags(post_content, desired=18):
     """Create a fallback set of hashtags based on keywords in the post."""
-    keywords_map = {
-        'design': '#Design', 'ui': '#UI', 'ux': '#UX', 'frontend': '#Frontend',
-        'react': '#React', 'javascript': '#JavaScript', 'python': '#Python', 'node': '#NodeJS',
-        'automation': '#Automation', 'bot': '#Bot', 'ai': '#AI', 'ml': '#MachineLearning',
-        'open source': '#OpenSource', 'opensource': '#OpenSource', 'web': '#WebDevelopment',
-        'learning': '#Learning', 'student': '#Student', 'career': '#Career', 'product': '#Product',
-        'backend': '#Backend', 'api': '#API', 'database': '#Database', 'cloud': '#Cloud',
-        'github': '#GitHub', 'code': '#Code', 'coding': '#Coding', 'css': '#CSS', 'html': '#HTML'
-    }
-    text = post_content.lower()
-    selected = []
-    for k, tag in keywords_map.items():
-        if k in text and tag not in selected:
-            selected.append(tag)
-    # Comprehensive defaults pool
-    defaults = [
-        '#WebDev', '#100DaysOfCode', '#Coding', '#Developer', '#Tech', '#Programming', 
-        '#Growth', '#Creativity', '#DevCommunity', '#TechCareer', '#Innovation',
-        '#BuildInPublic', '#LearnInPublic', '#SoftwareEngineering', '#CodeNewbie',
-        '#TechTwitter', '#DeveloperLife', '#OpenSource', '#CodingLife', '#WebDesign'
-    ]
-    for d in defaults:
-        if len(selected) >= desired:
-            break
-        if d not in selected:
-            selected.append(d)
-    # Ensure we have exactly `desired` hashtags
-    if len(selected) > desired:
-        selected = selected[:desired]
-    return ' '.join(selected)
-
-def upload_image_to_linkedin(image_data):
-    """Upload an image to LinkedIn and return the asset URN"""
-    print(f"📤 Uploading image to LinkedIn...")
-    
+    found = set(HASHTAG_KEYWORD_RE.findall(post_content.lower()))
+    # dict keys keep first-seen order and dedupe in O(1)
+    selected = dict.fromkeys(tag for k, tag in HASHTAG_KEYWORDS.items() if k in found)
+    # Pad with defaults not already chosen, then trim to exactly `desired`
+    selected.update(dict.fromkeys(d for d in DEFAULT_HASHTAGS if d not in selected))
+    return ' '.join(list(selected)[:desired])
+
+def register_image_upload():
+    """Register an image upload with LinkedIn; return (asset_urn, upload_url) or None."""
     try:
-        # Step 1: Register the upload
         register_url = "https://api.linkedin.com/v2/assets?action=registerUpload"
-        headers = {
-            'Authorization': f'Bearer {LINKEDIN_ACCESS_TOKEN}',
-            'Content-Type': 'application/json',
-            'X-Restli-Protocol-Version': '2.0.0'
-        }
         
         register_data = {
             "registerUploadRequest": {
                 "recipes": ["urn:li:digitalmediaRecipe:feedshare-image"],
-                "owner": f"urn:li:person:{LINKEDIN_USER_URN}",
+                "owner": LINKEDIN_AUTHOR,
                 "serviceRelationships": [
                     {
                         "relationshipType": "OWNER",
@@ -714,7 +1127,7 @@ def upload_image_to_linkedin(image_data):
             }
         }
         
-        response = requests.post(register_url, headers=headers, json=register_data)
+        response = linkedin_session.post(register_url, json=register_data, timeout=30)
         if response.status_code != 200:
             print(f"❌ Failed to register upload: {response.status_code}")
             print(response.text)
@@ -723,13 +1136,27 @@ def upload_image_to_linkedin(image_data):
         register_response = response.json()
         asset_urn = register_response['value']['asset']
         upload_url = register_response['value']['uploadMechanism']['com.linkedin.digitalmedia.uploading.MediaUploadHttpRequest']['uploadUrl']
+        return asset_urn, upload_url
+    except Exception as e:
+        print(f"⚠️  Error registering image upload: {e}")
+        return None
+
+
+def upload_image_to_linkedin(image_file, registration):
+    """Upload an image to LinkedIn and return the asset URN.
+
+    `registration` is the (asset_urn, upload_url) pair from a successful
+    register_image_upload() call; this function never registers on its own.
+    """
+    print(f"📤 Uploading image to LinkedIn...")
+    
+    try:
+        asset_urn, upload_url = registration
         
-        # Step 2: Upload the image data directly (no download needed now)
+        # Upload the image data directly (no download needed now)
         print("⬆️  Uploading to LinkedIn...")
-        upload_headers = {
-            'Authorization': f'Bearer {LINKEDIN_ACCESS_TOKEN}',
-        }
-        upload_response = requests.put(upload_url, headers=upload_headers, data=image_data)
+        image_file.seek(0)
+        upload_response = linkedin_session.put(upload_url, data=image_file, timeout=60)
         
         if upload_response.status_code in [200, 201]:
             print(f"✅ Image uploaded successfully: {asset_urn}")
@@ -747,61 +1174,132 @@ def upload_image_to_linkedin(image_data):
 def post_to_linkedin(message_text, image_asset_urn=None):
     """Post to LinkedIn with optional image"""
     url = "https://api.linkedin.com/v2/ugcPosts"
-    headers = {
-        'Authorization': f'Bearer {LINKEDIN_ACCESS_TOKEN}',
-        'Content-Type': 'application/json',
-        'X-Restli-Protocol-Version': '2.0.0'
-    }
     
-    # Prepare post data based on whether we have an image
+    # Only the commentary (and media) vary between posts; the rest is shared
+    share_content = {
+        "shareCommentary": {"text": message_text},
+        "shareMediaCategory": "NONE"
+    }
     if image_asset_urn:
-        post_data = {
-            "author": f"urn:li:person:{LINKEDIN_USER_URN}",
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {"text": message_text},
-                    "shareMediaCategory": "IMAGE",
-                    "media": [
-                        {
-                            "status": "READY",
-                            "media": image_asset_urn
-                        }
-                    ]
-                }
-            },
-            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-        }
-    else:
-        post_data = {
-            "author": f"urn:li:person:{LINKEDIN_USER_URN}",
-            "lifecycleState": "PUBLISHED",
-            "specificContent": {
-                "com.linkedin.ugc.ShareContent": {
-                    "shareCommentary": {"text": message_text},
-                    "shareMediaCategory": "NONE"
-                }
-            },
-            "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
-        }
+        share_content["shareMediaCategory"] = "IMAGE"
+        share_content["media"] = [
+            {
+                "status": "READY",
+                "media": image_asset_urn
+            }
+        ]
+    post_data = {
+        "author": LINKEDIN_AUTHOR,
+        "lifecycleState": "PUBLISHED",
+        "specificContent": {"com.linkedin.ugc.ShareContent": share_content},
+        "visibility": LINKEDIN_PUBLIC_VISIBILITY
+    }
     
     print(f"🤖 Posting: '{message_text[:30]}...'")
-    response = requests.post(url, headers=headers, json=post_data)
+    response = linkedin_session.post(url, data=json_dumps(post_data), headers=LINKEDIN_JSON_CONTENT, timeout=30)
     if response.status_code == 201:
         print("\n✅ SUCCESS! Post is live.")
+        return True
     else:
         print(f"\n❌ FAILED. {response.status_code}")
         print(response.text)
+        return False
+
+
+# --- ONCE-PER-DAY GUARD ---
+def already_posted_today():
+    """Return True if the sentinel file shows a live post was already published today.
+
+    Cron retries and manual re-runs would otherwise publish the same activity again.
+    """
+    if not POSTED_SENTINEL:
+        return False
+    try:
+        last = date.fromtimestamp(os.stat(POSTED_SENTINEL).st_mtime)
+    except OSError:
+        return False
+    return last == date.today()
+
+
+def mark_posted_today():
+    """Touch the sentinel file after a successful live post."""
+    if not POSTED_SENTINEL:
+        return
+    try:
+        with open(POSTED_SENTINEL, "w", encoding="utf-8"):
+            pass
+    except OSError as e:
+        print(f"⚠️  Could not update post sentinel {POSTED_SENTINEL}: {e}")
+
+
+
+# --- POSTED-ACTIVITY DEDUPE ---
+SEEN_ACTIVITY_TTL_DAYS = 7
+
+
+def _activity_key(context_data):
+    """Stable key for a GitHub activity, or None for generic/milestone posts."""
+    event_id = context_data.get('event_id')
+    if not event_id:
+        return None
+    raw = f"{context_data.get('full_repo')}|{context_data.get('type')}|{event_id}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def already_posted_activity(context_data):
+    """True if this exact activity was published by an earlier run."""
+    key = _activity_key(context_data)
+    if key is None:
+        return False
+    with _state_lock:
+        return get_state_db().execute(
+            "SELECT 1 FROM seen_activity WHERE key = ?", (key,)
+        ).fetchone() is not None
+
+
+def mark_activity_posted(context_data):
+    """Record a published activity and prune entries older than SEEN_ACTIVITY_TTL_DAYS."""
+    key = _activity_key(context_data)
+    if key is None:
+        return
+    now = int(time.time())
+    with _state_lock:
+        db = get_state_db()
+        db.execute("INSERT OR IGNORE INTO seen_activity (key, ts) VALUES (?, ?)", (key, now))
+        db.execute("DELETE FROM seen_activity WHERE ts < ?", (now - SEEN_ACTIVITY_TTL_DAYS * 86400,))
 
 # --- MAIN BRAIN ---
+# --- GRACEFUL STOP ---
+# SIGTERM (a cancelled workflow run, `kill`) stops any further post from going out
+# and ends the posting delay at once instead of leaving the process asleep for up
+# to an hour; a LinkedIn POST already in flight is allowed to finish
+stop_requested = threading.Event()
+
+
+def request_stop(signum, frame):
+    print("\n🛑 Stop requested — no further posts will be published.")
+    stop_requested.set()
+
+
 if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, request_stop)
     # Set TEST_MODE = True to preview posts without posting to LinkedIn
     TEST_MODE = False    # Change to False when you're ready to post live
     
     print("🤖 LinkedIn Post Bot Starting...\n")
     if TEST_MODE:
         print("🧪 TEST MODE ENABLED - Posts will NOT go live on LinkedIn\n")
+    elif already_posted_today():
+        print(f"✅ Already posted today (sentinel: {POSTED_SENTINEL}) — nothing to do.")
+        sys.exit(0)
     
+    # Stats are only needed on the milestone fallback, but fetching them in the
+    # background overlaps that (ETag-revalidated, usually free) GitHub round-trip
+    # with the events call below. The repo scan costs 1+N calls, so it only runs
+    # when the events feed comes back empty.
+    sensor_pool = ThreadPoolExecutor(max_workers=1)
+    stats_future = sensor_pool.submit(get_github_stats)
+
     # Priority 1: Check for today's GitHub activity (may return multiple)
     print("Step 1️⃣: Checking GitHub activity...")
     github_activities = get_latest_github_activity()
@@ -821,7 +1319,7 @@ if __name__ == "__main__":
         else:
             # Priority 2: Check for GitHub stats/milestones
             print("\nStep 2️⃣: Checking GitHub milestones...")
-            github_stats = get_github_stats()
+            github_stats = stats_future.result()
 
             if github_stats and (github_stats['public_repos'] % 5 == 0 or github_stats['followers'] % 10 == 0):
                 print("📊 Found a milestone! Generating post...\n")
@@ -833,75 +1331,127 @@ if __name__ == "__main__":
                     'type': 'generic'
                 }
                 posts_to_publish.append(generic_context)
+    sensor_pool.shutdown(wait=False)
     
+    # Activities that are still inside the 24h window but were already published
+    # by an earlier run would only cost a Groq call to produce a duplicate
+    fresh = [ctx for ctx in posts_to_publish if not already_posted_activity(ctx)]
+    if len(fresh) < len(posts_to_publish):
+        print(f"⏭️  Skipping {len(posts_to_publish) - len(fresh)} activity(ies) already posted on an earlier run")
+    posts_to_publish = fresh
+
     # Post multiple items (one post per activity)
     if posts_to_publish:
-        # Clear or create the preview file
-        with open("last_generated_post.txt", "w", encoding="utf-8") as f:
-            f.write("")
+        post_pool = ThreadPoolExecutor(max_workers=1)
+        image_pool = ThreadPoolExecutor(max_workers=1)
+        # Drafts are independent Groq round trips, so they all run at once
+        draft_pool = ThreadPoolExecutor(max_workers=min(4, len(posts_to_publish)))
+
+        def prepare_image(hint):
+            """Download an image and register + upload it to LinkedIn (live mode only).
 
-        for idx, ctx in enumerate(posts_to_publish):
-            print(f"\n--- Generating post {idx+1}/{len(posts_to_publish)} ---")
-            post_content = generate_post_with_ai(ctx)
+            Returns the image asset URN, or None in test mode, when there is no
+            image, or when the upload failed.
+            """
+            if TEST_MODE:
+                return None
+            image_data = get_relevant_image(hint)
+            if not image_data:
+                return None
+            # Register only once there is an image to put in the slot; a failed
+            # registration means no image rather than a second attempt
+            registration = register_image_upload()
+            if registration is None:
+                return None
+            return upload_image_to_linkedin(image_data, registration)
+
+        # Activity posts can pick their image from the repo alone, so it is prepared
+        # ahead of time; generic posts need the draft text to choose one. Only one
+        # post ahead: the first image overlaps the drafts, each later one the delay
+        # before its post, so a stopped run or failed post wastes at most one upload
+        # and no asset sits registered for hours before use.
+        image_futures = {}
+
+        def start_image(i):
+            """Begin fetching and uploading post i's image (once); returns its future or None."""
+            if i not in image_futures:
+                image_hint = image_hint_from_context(posts_to_publish[i])
+                image_futures[i] = image_pool.submit(prepare_image, image_hint) if image_hint else None
+            return image_futures[i]
+
+        # Clear or create the preview file once; each post is appended to the open handle
+        with open("last_generated_post.txt", "w", encoding="utf-8") as preview_file:
+            drafts = [draft_pool.submit(generate_post_with_ai, ctx) for ctx in posts_to_publish]
+            start_image(0)
+            for idx, ctx in enumerate(posts_to_publish):
+                if stop_requested.is_set():
+                    break
+                print(f"\n--- Generating post {idx+1}/{len(posts_to_publish)} ---")
+                post_content = drafts[idx].result()
             
-            # Final fallback: if the model output seems truncated, append synthesized hashtags
-            def _looks_complete_local(text: str) -> bool:
-                if not text or len(text.strip()) < 150:
-                    return False
-                lines = [l.strip() for l in text.strip().splitlines() if l.strip()]
-                if not lines:
-                    return False
-                last = lines[-1]
-                tags = [w for w in last.split() if w.startswith('#')]
-                # MUST have 15-20 hashtags on the last line - no exceptions
-                return 15 <= len(tags) <= 20
-
-            if post_content and not _looks_complete_local(post_content):
-                print("⚠️  Post missing proper hashtags line — applying fallback completion.")
-                # Ensure post ends with proper punctuation
-                if not post_content.strip().endswith(('.', '!', '?')):
-                    # Find the last complete sentence
-                    post_content = post_content.rstrip()
-                    # If it trails off, add ellipsis or period
-                    if post_content and post_content[-1].isalnum():
-                        post_content += '.'
-                hashtags_line = synthesize_hashtags(post_content, desired=18)
-                post_content = post_content.rstrip() + '\n\n' + hashtags_line
-            if not post_content:
-                print("❌ Failed to generate post content for activity; skipping.")
-                continue
+                # Final fallback: if the model output seems truncated, append synthesized hashtags
+                if post_content and not looks_complete(post_content):
+                    print("⚠️  Post missing proper hashtags line — applying fallback completion.")
+                    # Ensure post ends with proper punctuation
+                    if not post_content.strip().endswith(('.', '!', '?')):
+                        # Find the last complete sentence
+                        post_content = post_content.rstrip()
+                        # If it trails off, add ellipsis or period
+                        if post_content and post_content[-1].isalnum():
+                            post_content += '.'
+                    hashtags_line = synthesize_hashtags(post_content, desired=18)
+                    post_content = post_content.rstrip() + '\n\n' + hashtags_line
+                if not post_content:
+                    print("❌ Failed to generate post content for activity; skipping.")
+                    continue
 
-            # Append to preview file with separator
-            with open("last_generated_post.txt", "a", encoding="utf-8") as f:
-                f.write("\n" + "="*60 + "\n")
-                f.write(post_content + "\n")
-                f.write("="*60 + "\n")
+                if stop_requested.is_set():
+                    # The signal may have arrived while this draft was being written
+                    break
 
-            print("\n📝 GENERATED POST PREVIEW (saved to last_generated_post.txt):")
-            print(post_content)  # Show full post in preview
+                image_future = start_image(idx)
+                image_asset_urn = image_future.result() if image_future else prepare_image(post_content)
 
-            if TEST_MODE:
-                # Show image info in test mode
-                image_data = get_relevant_image(post_content)
-                if image_data:
-                    print(f"🖼️  Image downloaded successfully ({len(image_data)} bytes - would be used in live mode)")
+                # Live mode: the LinkedIn POST runs on a worker thread so its round trip
+                # overlaps the preview write/print below
+                post_future = None
+                if TEST_MODE:
+                    # Test mode previews text only; skip the Unsplash round trips
+                    print("🖼️  Image fetch skipped in test mode (an Unsplash image is attached in live mode)")
                 else:
-                    print("🖼️  No image for this post")
-            else:
-                # Live mode: fetch & upload image, then post
-                image_data = get_relevant_image(post_content)
-                image_asset_urn = None
-                if image_data:
-                    image_asset_urn = upload_image_to_linkedin(image_data)
+                    # Live mode: the image was already uploaded alongside the download
                     if image_asset_urn:
                         print("🎨 Post will include an image!")
-
-                post_to_linkedin(post_content, image_asset_urn)
-                # Rate limit between posts to avoid spam
-                if idx < (len(posts_to_publish) - 1):
-                    delay_minutes = POST_DELAY_SECONDS / 60
-                    print(f"⏱ Sleeping {delay_minutes:.0f} minutes before next post...")
-                    time.sleep(POST_DELAY_SECONDS)
+                    post_future = post_pool.submit(post_to_linkedin, post_content, image_asset_urn)
+
+                # Append to preview file with separator; flushed so the preview is
+                # readable during the posting delay
+                preview_file.write("\n" + "="*60 + "\n" + post_content + "\n" + "="*60 + "\n")
+                preview_file.flush()
+
+                print("\n📝 GENERATED POST PREVIEW (saved to last_generated_post.txt):")
+                print(post_content)  # Show full post in preview
+
+                if post_future is not None:
+                    if post_future.result():
+                        mark_posted_today()
+                        mark_activity_posted(ctx)
+                        # Only published openings count as "recent" for the next prompts
+                        append_post_history(ctx, post_content)
+                        # Durable before the posting delay: a timeout or SIGKILL
+                        # mid-sleep must not let the next run re-post this activity
+                        commit_state_db()
+                    # Rate limit between posts to avoid spam
+                    if idx < (len(posts_to_publish) - 1):
+                        start_image(idx + 1)
+                        delay_minutes = POST_DELAY_SECONDS / 60
+                        print(f"⏱ Sleeping {delay_minutes:.0f} minutes before next post...")
+                        if stop_requested.wait(POST_DELAY_SECONDS):
+                            break
+        post_pool.shutdown()
+        # After a stop request, drafts/images for the skipped posts are not needed
+        image_pool.shutdown(cancel_futures=True)
+        draft_pool.shutdown(cancel_futures=True)
         print("\nAll posts processed. Previews saved to last_generated_post.txt")
     else:
         print("❌ No activities to generate posts from.")
\ No newline at end of file
@@ -16,17 +16,21 @@ def reset_post_history():
         return
     
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+    # WAL is persistent in the file, so this also switches later writers to it;
+    # with WAL, synchronous=NORMAL only fsyncs at checkpoints
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
     
-    # Count existing entries
-    cur.execute("SELECT COUNT(*) FROM post_history")
-    count = cur.fetchone()[0]
+    # One DELETE (SQLite truncates the table when there is no WHERE clause);
+    # rowcount reports how many posts it removed, so no separate COUNT(*) pass
+    with conn:
+        count = conn.execute("DELETE FROM post_history").rowcount
     print(f"Found {count} posts in database")
     
     if count > 0:
-        # Delete all entries
-        cur.execute("DELETE FROM post_history")
-        conn.commit()
+        # Hand the freed pages back to the filesystem
+        conn.execute("VACUUM")
         print(f"✅ Deleted {count} posts. Stats are now reset to 0!")
     else:
         print("No posts to delete.")
@@ -1,7 +1,12 @@
 import os
-import datetime
-from dateutil import parser
-from groq import Groq
+import re
+import asyncio
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from groq import AsyncGroq, Groq
 
 # Load .env file for local development
 try:
@@ -24,12 +29,10 @@ GITHUB_USERNAME = os.getenv('GITHUB_USERNAME', 'cliff-de-tech')  # Fallback for
 BASE_PERSONA = """You are writing LinkedIn posts for Clifford (Darko) Opoku-Sarkodie, a Creative Technologist, Web Developer, and CS Student.
 
 ABOUT THE VOICE:
-- Young, energetic developer passionate about web development and creativity
+- Young, energetic CS student building beautiful, functional web experiences
 - Balances technical skills with design thinking and UI/UX expertise
-- CS student on a learning journey - shares real discoveries and "aha moments"
-- Enthusiastic about building beautiful, functional web experiences
-- Community-focused and open to collaboration
-- Growing professional navigating the tech industry"""
+- Shares real discoveries and "aha moments" from a learning journey
+- Community-focused and open to collaboration"""
 
 TEMPLATES = {
     "standard": """
@@ -264,32 +267,25 @@ ACTIVITY_TONES = {
     }
 }
 
+@lru_cache(maxsize=32)
 def get_prompt_for_style(style="standard"):
-    """Get the full system prompt for a specific style."""
+    """Get the full system prompt for a specific style (cached - the style set is small and fixed)."""
     template = TEMPLATES.get(style, TEMPLATES["standard"])
     
     return f"""{BASE_PERSONA}
 
 {template}
 
-WORD COUNT & FORMAT:
-- Target: 200-300 words (1,300-1,600 characters) - LinkedIn's optimal length
-- Multiple short paragraphs for readability
-- Conversational, authentic, like talking to peers
-- Include 3-4 emojis naturally (🎨 🚀 💡 ✨ 🔥 💻 🎯 📱 ⚡ 🧠)
-- NO markdown formatting, NO code blocks, NO bullet points
-- Keep it punchy and engaging
+FORMAT:
+- 200-300 words (1,300-1,600 characters) in short, conversational paragraphs
+- 3-4 emojis, used naturally (prefer the activity's emojis below)
+- NO markdown, code blocks or bullet points
+- Balance technical insight with accessibility; share learning, not just achievements
+- Finish the whole post - never stop mid-sentence"""
 
-MANDATORY:
-- Posts must feel COMPLETE - no cutting off mid-sentence
-- Balance technical insight with accessibility
-- Share learning, not just achievements"""
 
-
-def get_activity_tone_modifier(activity_type: str) -> str:
-    """Get tone modifier text for a specific activity type."""
-    tone_info = ACTIVITY_TONES.get(activity_type, ACTIVITY_TONES["generic"])
-    
+def _build_tone_modifier(tone_info: dict) -> str:
+    """Render the tone block for one ACTIVITY_TONES entry."""
     return f"""\n\nACTIVITY-SPECIFIC TONE:
 - Voice: {tone_info['tone']}
 - Mood: {tone_info['mood']}
@@ -297,7 +293,90 @@ def get_activity_tone_modifier(activity_type: str) -> str:
 - Preferred Emojis: {tone_info['emoji_set']}
 - Suggested CTA: "{tone_info['cta_style']}"
 
-IMPORTANT: Match the emotional energy and focus to this specific activity type. Make it feel natural and authentic."""
+Match the energy and focus to this activity type."""
+
+
+# Tone blocks rendered once per activity type
+ACTIVITY_TONE_MODIFIERS = {activity_type: _build_tone_modifier(tone_info)
+                           for activity_type, tone_info in ACTIVITY_TONES.items()}
+
+
+def get_activity_tone_modifier(activity_type: str) -> str:
+    """Get tone modifier text for a specific activity type."""
+    return ACTIVITY_TONE_MODIFIERS.get(activity_type, ACTIVITY_TONE_MODIFIERS["generic"])
+
+
+# Every (style, activity type) system prompt, assembled once at import
+SYSTEM_PROMPTS = {
+    (style, activity_type): get_prompt_for_style(style) + get_activity_tone_modifier(activity_type)
+    for style in TEMPLATES
+    for activity_type in ACTIVITY_TONES
+}
+
+
+def get_system_prompt(style: str, activity_type: str) -> str:
+    """Full system prompt for a style + activity type (unknown values fall back like the builders do)."""
+    return SYSTEM_PROMPTS[(
+        style if style in TEMPLATES else "standard",
+        activity_type if activity_type in ACTIVITY_TONES else "generic",
+    )]
+
+
+# Per-activity user messages, filled with str.format_map from the context
+USER_TEMPLATES = {
+    "push": """
+Write an ENERGETIC LinkedIn post about my coding momentum!
+Activity: I pushed {commits} commits to '{repo}'.
+Context: The project involves: {description}
+Vibe: I'm in the zone, making progress, shipping code.
+Key Message: Consistency beats perfection. Every commit counts.
+""",
+    "pull_request": """
+Write a PROUD LinkedIn post about a Pull Request I just {state_str}.
+Repository: {repo}
+PR Title: {title}
+PR Description: {body}
+Achievement: {achievement}
+Vibe: Collaborative, shipping features, making impact.
+Key Message: Good things happen when you collaborate and put your code out there.
+""",
+    "new_repo": """
+Write an EXCITED LinkedIn post about a brand new project I'm launching!
+Project Name: {repo}
+Description: {description}
+Main Tech Stack: {language}
+Vibe: New beginnings, I'm building something from scratch!
+Key Message: Every great project starts with a single commit. This is day one.
+""",
+    # Generic or manual context
+    "generic": """
+Write a LinkedIn post about: {topic}
+Details: {details}
+Context: I want to share this update with my professional network.
+""",
+}
+
+# Values used when the context does not carry a field
+USER_TEMPLATE_DEFAULTS = {
+    "push": {'commits': 0, 'repo': 'unknown-repo', 'description': ''},
+    "pull_request": {'title': 'Unknown PR', 'repo': 'unknown-repo', 'body': ''},
+    "new_repo": {'repo': 'New Project', 'description': '', 'language': 'Code'},
+    "generic": {'topic': 'Coding & Development',
+                'details': 'Just sharing some thoughts on my developer journey.'},
+}
+
+
+def build_user_prompt(context_data: dict) -> str:
+    """Render the user message for an activity context."""
+    activity_type = context_data.get('type')
+    if activity_type not in USER_TEMPLATES:
+        activity_type = "generic"
+    values = {**USER_TEMPLATE_DEFAULTS[activity_type], **context_data}
+    if activity_type == "pull_request":
+        merged = context_data.get('merged', False)
+        values['state_str'] = "merged" if merged else "opened"
+        values['achievement'] = "This is a WIN!" if merged else "Putting my work out there for review."
+    return USER_TEMPLATES[activity_type].format_map(values)
 
 
 # Initialize Groq client (guarded)
@@ -309,121 +388,291 @@ if GROQ_API_KEY:
         client = None
 
 
-def generate_post_with_ai(context_data, groq_api_key: str = None, style: str = "standard"):
+@lru_cache(maxsize=64)
+def _client_for_key(api_key: str):
+    """Build (once) a Groq client for a per-user API key, keeping its connection pool warm."""
+    return Groq(api_key=api_key)
+
+
+def get_groq_client(api_key: str):
+    """Return a reusable Groq client: the module-level one for the env key, else a cached per-key client."""
+    if api_key == GROQ_API_KEY and client is not None:
+        return client
+    return _client_for_key(api_key)
+
+
+# =============================================================================
+# RESPONSE CACHE
+# =============================================================================
+# Opt-in (generate_post_with_ai(..., cache=True)): sampling at temperature 0.7 means
+# a cached post is a replay, which callers may not want for every request.
+
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_TTL_SECONDS = 3600
+
+_response_cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, post)
+_response_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+
+def _response_cache_key(api_key: str, system_prompt: str, user_content: str) -> str:
+    """Key a request by the Groq API key and the prompt actually sent to the model.
+
+    Context fields the prompt never uses (relative dates, PR numbers, full_repo...)
+    change between otherwise identical requests; keying on the rendered prompt
+    lets those near-duplicates share one cached post. The API key scopes entries
+    to one tenant, so a user never gets another user's post (or skips their own
+    key's call). Only its hash ends up in the cache.
+    """
+    return hashlib.sha256(f"{api_key}\0{system_prompt}\0{user_content}".encode()).hexdigest()
+
+
+def _cache_get(key: str):
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and entry[0] > time.time():
+            _response_cache.move_to_end(key)
+            _cache_stats["hits"] += 1
+            return entry[1]
+        if entry:
+            del _response_cache[key]
+        _cache_stats["misses"] += 1
+        return None
+
+
+def _cache_put(key: str, post: str):
+    with _response_cache_lock:
+        _response_cache[key] = (time.time() + RESPONSE_CACHE_TTL_SECONDS, post)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def get_cache_stats() -> dict:
+    """Return response-cache hit/miss counters and the current entry count."""
+    with _response_cache_lock:
+        return {**_cache_stats, "size": len(_response_cache)}
+
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+# 200-300 words plus a hashtag line is ~450 tokens; 550 leaves headroom without
+# paying for rambling drafts
+COMPLETION_OPTIONS = {"model": GROQ_MODEL, "temperature": 0.7, "max_tokens": 550}
+
+# Concurrent Groq calls per batch; keeps a burst under per-key rate limits
+BATCH_CONCURRENCY = 4
+
+
+def _build_messages(context_data: dict, style: str) -> list:
+    """System + user chat messages for a context (shared by the sync and async paths)."""
+    # Style template + activity-specific tone, prebuilt at import. The system message
+    # must stay byte-identical per (style, activity type) - no dates, names or other
+    # context - so the provider can reuse the cached prompt prefix; everything
+    # request-specific goes in the user message.
+    system_prompt = get_system_prompt(style, context_data.get('type', 'generic'))
+    return [
+        {
+            "role": "system",
+            "content": system_prompt
+        },
+        {
+            "role": "user",
+            "content": build_user_prompt(context_data),
+        }
+    ]
+
+
+def _resolve_api_key(groq_api_key: str = None):
+    """Per-user key if given, else GROQ_API_KEY; None (with a warning) if neither is set."""
+    api_key = groq_api_key or GROQ_API_KEY
+    if not api_key:
+        print("⚠️  No Groq API key provided (neither user key nor GROQ_API_KEY env var)")
+    return api_key
+
+
+def _lookup_cached_post(api_key: str, messages: list, cache: bool):
+    """Return (cache_key, cached_post) for a request; both None when caching is off.
+
+    cache_key is what _store_post needs after a miss; cached_post is set on a hit.
+    """
+    if not cache:
+        return None, None
+    cache_key = _response_cache_key(api_key, messages[0]["content"], messages[1]["content"])
+    cached_post = _cache_get(cache_key)
+    if cached_post is not None:
+        print("♻️  AI service: returning cached post")
+    return cache_key, cached_post
+
+
+def _store_post(cache_key, post):
+    """Cache a freshly generated post (if caching was requested) and return it."""
+    if cache_key and post:
+        _cache_put(cache_key, post)
+    return post
+
+
+def generate_post_with_ai(context_data, groq_api_key: str = None, style: str = "standard", cache: bool = False):
     """Use Groq/Gemini-style model to draft a LinkedIn post based on context.
     
     Args:
         context_data: Dictionary with activity context
         groq_api_key: Optional per-user Groq API key. Falls back to env var if not provided.
         style: Post style template ('standard', 'build_in_public', 'thought_leadership', 'job_search')
+        cache: Return a recent post for a request that renders the same prompt instead
+            of calling Groq again
     """
     print(f"🧠 AI service: generating {style} post...")
     
     # Determine which API key to use
-    api_key = groq_api_key or GROQ_API_KEY
+    api_key = _resolve_api_key(groq_api_key)
     if not api_key:
-        print("⚠️  No Groq API key provided (neither user key nor GROQ_API_KEY env var)")
         return None
     
-    # Create client with the appropriate key
+    # Reuse the client for this key (TLS + keep-alive survive between posts)
     try:
-        active_client = Groq(api_key=api_key)
+        active_client = get_groq_client(api_key)
     except Exception as e:
         print(f"⚠️  Failed to initialize Groq client: {e}")
         return None
     
-    # Select prompt based on style
-    system_prompt = get_prompt_for_style(style)
+    messages = _build_messages(context_data, style)
+    cache_key, cached_post = _lookup_cached_post(api_key, messages, cache)
+    if cached_post is not None:
+        return cached_post
+
+    try:
+        chat_completion = active_client.chat.completions.create(messages=messages, **COMPLETION_OPTIONS)
+        return _store_post(cache_key, chat_completion.choices[0].message.content)
+        
+    except Exception as e:
+        print(f"❌ Error generating post with Groq: {e}")
+        return None
+
+
+def generate_post_streaming(context_data, groq_api_key: str = None, style: str = "standard"):
+    """Like generate_post_with_ai, but yield the post in chunks as Groq produces them.
+
+    Lets a consumer (e.g. a streaming HTTP response) start on the first tokens instead
+    of waiting for the whole completion; ``"".join(...)`` gives the full post. Yields
+    nothing if no API key is available or the request fails.
+    """
+    print(f"🧠 AI service: streaming {style} post...")
     
-    # Format the prompt based on context type
-    activity_type = context_data.get('type', 'generic')
-    user_content = ""
+    api_key = _resolve_api_key(groq_api_key)
+    if not api_key:
+        return
     
-    # Add activity-specific tone modifier to the system prompt
-    activity_tone = get_activity_tone_modifier(activity_type)
-    system_prompt = system_prompt + activity_tone
+    try:
+        active_client = get_groq_client(api_key)
+        stream = active_client.chat.completions.create(
+            messages=_build_messages(context_data, style), stream=True, **COMPLETION_OPTIONS
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        print(f"❌ Error streaming post from Groq: {e}")
+
+
+@lru_cache(maxsize=64)
+def get_async_groq_client(api_key: str):
+    """Build (once) an AsyncGroq client per API key."""
+    return AsyncGroq(api_key=api_key)
+
+
+async def generate_post_with_ai_async(context_data, groq_api_key: str = None, style: str = "standard",
+                                      cache: bool = False):
+    """Async counterpart of generate_post_with_ai (same arguments and return value).
+
+    Lets async callers await the Groq round trip instead of blocking the event loop.
+    """
+    print(f"🧠 AI service: generating {style} post...")
     
-    if context_data.get('type') == 'push':
-        commits = context_data.get('commits', 0)
-        repo = context_data.get('repo', 'unknown-repo')
-        description = context_data.get('description', '')
-        
-        user_content = f"""
-        Write an ENERGETIC LinkedIn post about my coding momentum!
-        Activity: I pushed {commits} commits to '{repo}'.
-        Context: The project involves: {description}
-        Vibe: I'm in the zone, making progress, shipping code.
-        Key Message: Consistency beats perfection. Every commit counts.
-        """
-        
-    elif context_data.get('type') == 'pull_request':
-        title = context_data.get('title', 'Unknown PR')
-        repo = context_data.get('repo', 'unknown-repo')
-        body = context_data.get('body', '')
-        merged = context_data.get('merged', False)
-        
-        state_str = "merged" if merged else "opened"
-        achievement = "This is a WIN!" if merged else "Putting my work out there for review."
-        
-        user_content = f"""
-        Write a PROUD LinkedIn post about a Pull Request I just {state_str}.
-        Repository: {repo}
-        PR Title: {title}
-        PR Description: {body}
-        Achievement: {achievement}
-        Vibe: Collaborative, shipping features, making impact.
-        Key Message: Good things happen when you collaborate and put your code out there.
-        """
-        
-    elif context_data.get('type') == 'new_repo':
-        repo = context_data.get('repo', 'New Project')
-        description = context_data.get('description', '')
-        language = context_data.get('language', 'Code')
-        
-        user_content = f"""
-        Write an EXCITED LinkedIn post about a brand new project I'm launching!
-        Project Name: {repo}
-        Description: {description}
-        Main Tech Stack: {language}
-        Vibe: New beginnings, I'm building something from scratch!
-        Key Message: Every great project starts with a single commit. This is day one.
-        """
-        
-    else:
-        # Generic or manual context
-        topic = context_data.get('topic', 'Coding & Development')
-        details = context_data.get('details', 'Just sharing some thoughts on my developer journey.')
-        
-        user_content = f"""
-        Write a LinkedIn post about: {topic}
-        Details: {details}
-        Context: I want to share this update with my professional network.
-        """
+    api_key = _resolve_api_key(groq_api_key)
+    if not api_key:
+        return None
+    
+    try:
+        active_client = get_async_groq_client(api_key)
+    except Exception as e:
+        print(f"⚠️  Failed to initialize Groq client: {e}")
+        return None
+    
+    messages = _build_messages(context_data, style)
+    cache_key, cached_post = _lookup_cached_post(api_key, messages, cache)
+    if cached_post is not None:
+        return cached_post
 
     try:
-        chat_completion = active_client.chat.completions.create(
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": user_content,
-                }
-            ],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=600,
-        )
-        
-        return chat_completion.choices[0].message.content
+        chat_completion = await active_client.chat.completions.create(messages=messages, **COMPLETION_OPTIONS)
+        return _store_post(cache_key, chat_completion.choices[0].message.content)
         
     except Exception as e:
         print(f"❌ Error generating post with Groq: {e}")
         return None
 
 
+async def warm_groq_connection():
+    """Open the env-key AsyncGroq connection ahead of the first request.
+
+    A cheap models.list() call pays the TCP + TLS handshake up front, so the
+    first generation does not. Failures are ignored - the real call will retry.
+    """
+    if not GROQ_API_KEY:
+        return
+    try:
+        await get_async_groq_client(GROQ_API_KEY).models.list()
+    except Exception as e:
+        print(f"⚠️  Groq warmup skipped: {type(e).__name__}")
+
+
+async def generate_posts_batch(jobs: list, groq_api_key: str = None, cache: bool = False) -> list:
+    """Generate several posts concurrently.
+
+    Args:
+        jobs: List of (context_data, style) tuples
+        groq_api_key: Optional per-user Groq API key shared by every job
+
+    Returns:
+        One result per job, in order: the post, None if generation failed, or the
+        exception a job raised (one bad context does not sink the batch)
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(context_data, style):
+        async with semaphore:
+            return await generate_post_with_ai_async(context_data, groq_api_key=groq_api_key,
+                                                     style=style, cache=cache)
+
+    return await asyncio.gather(*(run(context_data, style) for context_data, style in jobs),
+                                return_exceptions=True)
+
+
+HASHTAG_KEYWORDS = {
+    'design': '#Design', 'ui': '#UI', 'ux': '#UX', 'frontend': '#Frontend',
+    'react': '#React', 'javascript': '#JavaScript', 'python': '#Python', 'node': '#NodeJS',
+    'automation': '#Automation', 'bot': '#Bot', 'ai': '#AI', 'ml': '#MachineLearning',
+    'open source': '#OpenSource', 'opensource': '#OpenSource', 'web': '#WebDevelopment',
+    'learning': '#Learning', 'student': '#Student', 'career': '#Career', 'product': '#Product',
+    'backend': '#Backend', 'api': '#API', 'database': '#Database', 'cloud': '#Cloud',
+    'github': '#GitHub', 'code': '#Code', 'coding': '#Coding', 'css': '#CSS', 'html': '#HTML'
+}
+
+# Comprehensive defaults pool
+DEFAULT_HASHTAGS = (
+    '#WebDev', '#100DaysOfCode', '#Coding', '#Developer', '#Tech', '#Programming',
+    '#Growth', '#Creativity', '#DevCommunity', '#TechCareer', '#Innovation',
+    '#BuildInPublic', '#LearnInPublic', '#SoftwareEngineering', '#CodeNewbie',
+    '#TechTwitter', '#DeveloperLife', '#OpenSource', '#CodingLife', '#WebDesign'
+)
+
+# One alternation matching any keyword at the start of a word (longest first), so
+# the post is scanned once instead of once per keyword
+HASHTAG_KEYWORD_RE = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(HASHTAG_KEYWORDS, key=len, reverse=True)) + ')'
+)
+
+
 def synthesize_hashtags(post_content: str, desired: int = 18) -> str:
     """
     Create a fallback set of hashtags based on keywords in the post.
@@ -437,42 +686,11 @@ def synthesize_hashtags(post_content: str, desired: int = 18) -> str:
         
     Used as fallback when AI doesn't generate proper hashtags.
     """
-    keywords_map = {
-        'design': '#Design', 'ui': '#UI', 'ux': '#UX', 'frontend': '#Frontend',
-        'react': '#React', 'javascript': '#JavaScript', 'python': '#Python', 'node': '#NodeJS',
-        'automation': '#Automation', 'bot': '#Bot', 'ai': '#AI', 'ml': '#MachineLearning',
-        'open source': '#OpenSource', 'opensource': '#OpenSource', 'web': '#WebDevelopment',
-        'learning': '#Learning', 'student': '#Student', 'career': '#Career', 'product': '#Product',
-        'backend': '#Backend', 'api': '#API', 'database': '#Database', 'cloud': '#Cloud',
-        'github': '#GitHub', 'code': '#Code', 'coding': '#Coding', 'css': '#CSS', 'html': '#HTML'
-    }
-    
-    text = post_content.lower()
-    selected = []
+    found = set(HASHTAG_KEYWORD_RE.findall(post_content.lower()))
     
-    # Match keywords in content
-    for k, tag in keywords_map.items():
-        if k in text and tag not in selected:
-            selected.append(tag)
-    
-    # Comprehensive defaults pool
-    defaults = [
-        '#WebDev', '#100DaysOfCode', '#Coding', '#Developer', '#Tech', '#Programming', 
-        '#Growth', '#Creativity', '#DevCommunity', '#TechCareer', '#Innovation',
-        '#BuildInPublic', '#LearnInPublic', '#SoftwareEngineering', '#CodeNewbie',
-        '#TechTwitter', '#DeveloperLife', '#OpenSource', '#CodingLife', '#WebDesign'
-    ]
+    # Match keywords in content (dict keys keep first-seen order and dedupe)
+    selected = dict.fromkeys(tag for k, tag in HASHTAG_KEYWORDS.items() if k in found)
     
-    # Fill with defaults
-    for d in defaults:
-        if len(selected) >= desired:
-            break
-        if d not in selected:
-            selected.append(d)
-    
-    # Ensure exactly `desired` hashtags
-    if len(selected) > desired:
-        selected = selected[:desired]
-    
-    return ' '.join(selected)
-
+    # Fill with defaults, then trim to exactly `desired`
+    selected.update(dict.fromkeys(d for d in DEFAULT_HASHTAGS if d not in selected))
+    return ' '.join(list(selected)[:desired])
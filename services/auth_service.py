@@ -26,10 +26,22 @@ Token Lifecycle:
 """
 
 import os
+import json
 import time
+import asyncio
+import weakref
 import requests
-from urllib.parse import quote
-from services.token_store import save_token, get_token_by_urn
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import quote, urlencode
+from services.token_store import save_token, get_token_by_urn, get_token_by_urn_cached
+
+# orjson decodes the token/userinfo bodies straight from bytes; optional
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # LinkedIn OAuth configuration from environment
 # SECURITY: These are loaded from environment variables, never hardcoded
@@ -42,6 +54,49 @@ CLIENT_SECRET = os.getenv('LINKEDIN_CLIENT_SECRET', '')
 # - w_member_social: Required for posting content
 SCOPE = os.getenv('LINKEDIN_OAUTH_SCOPE', 'openid profile email w_member_social')
 
+# Shared HTTP session for the OAuth and userinfo calls. Keep-alive pooling means
+# the token POST and the userinfo GET that follows it reuse one TLS connection
+# per host instead of handshaking on every call. Transient 5xx responses are
+# retried with backoff for idempotent requests only: authorization codes and
+# rotating refresh tokens are single-use, so the token POSTs are never replayed.
+OAUTH_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+oauth_session = requests.Session()
+oauth_session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=OAUTH_RETRY))
+
+USERINFO_URL = 'https://api.linkedin.com/v2/userinfo'
+
+
+USERINFO_WARMUP_TIMEOUT = 2
+
+# Keeps fire-and-forget warmup tasks referenced until they finish
+_warmup_tasks = set()
+
+
+async def _warm_userinfo_connection(verify: bool) -> None:
+    try:
+        # A HEAD through oauth_session leaves a keep-alive connection in the same
+        # pool the userinfo GET draws from; the short timeout bounds a bad network
+        await asyncio.to_thread(
+            oauth_session.head, 'https://api.linkedin.com/',
+            timeout=USERINFO_WARMUP_TIMEOUT, verify=verify, allow_redirects=False
+        )
+    except Exception:
+        pass
+
+
+def _start_userinfo_warmup(verify: bool = True) -> None:
+    """
+    Open a pooled connection to api.linkedin.com ahead of the userinfo call.
+    
+    Started alongside the token POST and never awaited, so the userinfo GET
+    that depends on the POST's result usually finds a connection with DNS,
+    TCP and TLS already done. Best effort: if the warmup is slow or fails,
+    the GET just connects on its own.
+    """
+    task = asyncio.create_task(_warm_userinfo_connection(verify))
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
 
 def get_authorize_url(redirect_uri: str, state: str) -> str:
     """
@@ -72,7 +127,7 @@ def get_authorize_url(redirect_uri: str, state: str) -> str:
         'scope': SCOPE,
         'state': state
     }
-    q = '&'.join([f"{k}={quote(v)}" for k, v in params.items()])
+    q = urlencode(params, safe='/', quote_via=quote)
     return f"https://www.linkedin.com/oauth/v2/authorization?{q}"
 
 
@@ -115,24 +170,28 @@ async def exchange_code_for_token(code: str, redirect_uri: str, user_id: str = N
     try:
         # SECURITY: Using timeout to prevent hanging connections
         # verify=False added to resolve potential local SSL/Network errors
-        resp = requests.post(token_url, data=data, headers=headers, timeout=10, verify=False)
+        # Blocking HTTP runs in a worker thread so the event loop keeps serving requests
+        _start_userinfo_warmup(verify=False)
+        resp = await asyncio.to_thread(
+            oauth_session.post, token_url, data=data, headers=headers, timeout=10, verify=False
+        )
         resp.raise_for_status()
         
-        token_data = resp.json()
+        token_data = json_loads(resp.content)
         access_token = token_data.get('access_token')
         expires_in = token_data.get('expires_in')
 
         # Use OpenID Connect userinfo endpoint to get user identity
         # This is more reliable than the legacy /v2/me endpoint
-        userinfo_url = 'https://api.linkedin.com/v2/userinfo'
-        userinfo_resp = requests.get(
-            userinfo_url, 
+        userinfo_resp = await asyncio.to_thread(
+            oauth_session.get,
+            USERINFO_URL, 
             headers={'Authorization': f'Bearer {access_token}'}, 
             timeout=10,
             verify=False
         )
         userinfo_resp.raise_for_status()
-        userinfo = userinfo_resp.json()
+        userinfo = json_loads(userinfo_resp.content)
         
         # 'sub' is the OpenID Connect standard claim for user ID
         linkedin_id = userinfo.get('sub')
@@ -193,7 +252,7 @@ def get_authorize_url_for_user(client_id: str, redirect_uri: str, state: str) ->
         'scope': SCOPE,
         'state': state
     }
-    q = '&'.join([f"{k}={quote(v)}" for k, v in params.items()])
+    q = urlencode(params, safe='/', quote_via=quote)
     return f"https://www.linkedin.com/oauth/v2/authorization?{q}"
 
 
@@ -237,22 +296,23 @@ async def exchange_code_for_token_with_user(
     }
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     
-    resp = requests.post(token_url, data=data, headers=headers, timeout=10)
+    _start_userinfo_warmup()
+    resp = await asyncio.to_thread(oauth_session.post, token_url, data=data, headers=headers, timeout=10)
     resp.raise_for_status()
     
-    token_data = resp.json()
+    token_data = json_loads(resp.content)
     access_token = token_data.get('access_token')
     expires_in = token_data.get('expires_in')
 
     # Get user identity via OpenID Connect
-    userinfo_url = 'https://api.linkedin.com/v2/userinfo'
-    userinfo_resp = requests.get(
-        userinfo_url, 
+    userinfo_resp = await asyncio.to_thread(
+        oauth_session.get,
+        USERINFO_URL, 
         headers={'Authorization': f'Bearer {access_token}'}, 
         timeout=10
     )
     userinfo_resp.raise_for_status()
-    userinfo = userinfo_resp.json()
+    userinfo = json_loads(userinfo_resp.content)
     
     linkedin_id = userinfo.get('sub')
     if not linkedin_id:
@@ -307,10 +367,10 @@ def refresh_access_token(refresh_token: str) -> dict:
     }
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     
-    resp = requests.post(token_url, data=data, headers=headers, timeout=10)
+    resp = oauth_session.post(token_url, data=data, headers=headers, timeout=10)
     resp.raise_for_status()
     
-    token_data = resp.json()
+    token_data = json_loads(resp.content)
     access_token = token_data.get('access_token')
     expires_in = token_data.get('expires_in')
     new_refresh = token_data.get('refresh_token', refresh_token)
@@ -324,6 +384,25 @@ def refresh_access_token(refresh_token: str) -> dict:
     }
 
 
+# Per-URN refresh locks; entries disappear once no caller holds the lock
+_refresh_locks = weakref.WeakValueDictionary()
+
+
+def _refresh_lock_for(linkedin_user_urn: str) -> asyncio.Lock:
+    """Return the lock serializing token refreshes for one LinkedIn user."""
+    lock = _refresh_locks.get(linkedin_user_urn)
+    if lock is None:
+        lock = asyncio.Lock()
+        _refresh_locks[linkedin_user_urn] = lock
+    return lock
+
+
+def _needs_refresh(token_row: dict, refresh_buffer: int) -> bool:
+    """True if the stored token expires within `refresh_buffer` seconds."""
+    expires_at = token_row.get('expires_at')
+    return bool(expires_at) and (expires_at - int(time.time())) <= refresh_buffer
+
+
 async def get_access_token_for_urn(linkedin_user_urn: str, refresh_buffer: int = 60) -> str:
     """
     Get a valid access token for a LinkedIn user, refreshing if needed.
@@ -344,30 +423,37 @@ async def get_access_token_for_urn(linkedin_user_urn: str, refresh_buffer: int =
     SECURITY: Tokens are refreshed proactively to avoid failed API calls.
     The refresh buffer ensures continuous availability.
     """
-    token_row = await get_token_by_urn(linkedin_user_urn)
+    token_row = await get_token_by_urn_cached(linkedin_user_urn, refresh_buffer)
     if not token_row:
         raise RuntimeError('No token found for this linkedin_user_urn')
 
-    access_token = token_row.get('access_token')
-    refresh_token = token_row.get('refresh_token')
-    expires_at = token_row.get('expires_at')
-
-    now = int(time.time())
-    
     # Check if token needs refresh (within buffer period of expiry)
-    if expires_at and (expires_at - now) <= refresh_buffer:
+    if not _needs_refresh(token_row, refresh_buffer):
+        return token_row.get('access_token')
+
+    # Single-flight: concurrent callers for the same URN queue here, and only the
+    # first one refreshes. The others re-read the row and reuse the new token
+    # instead of spending a round trip (and, with rotating refresh tokens,
+    # invalidating the token the first caller just received).
+    async with _refresh_lock_for(linkedin_user_urn):
+        token_row = await get_token_by_urn(linkedin_user_urn)
+        if not token_row:
+            raise RuntimeError('No token found for this linkedin_user_urn')
+        if not _needs_refresh(token_row, refresh_buffer):
+            return token_row.get('access_token')
+
+        refresh_token = token_row.get('refresh_token')
         if not refresh_token:
             raise RuntimeError('No refresh token available to refresh access token')
         
-        refreshed = refresh_access_token(refresh_token)
+        # Sync HTTP call; run it off the event loop
+        refreshed = await asyncio.to_thread(refresh_access_token, refresh_token)
         
         # Update stored token with new values
         await save_token(
             linkedin_user_urn, 
             refreshed['access_token'], 
-            refreshed.get('refresh_token'), 
-            refreshed.get('expires_at')
+            refresh_token=refreshed.get('refresh_token'), 
+            expires_at=refreshed.get('expires_at')
         )
         return refreshed['access_token']
-
-    return access_token
@@ -34,12 +34,73 @@ SECURITY NOTES:
 """
 
 import logging
+import time
+from collections import OrderedDict
 from services.db import get_database
 from services.encryption import encrypt_value, decrypt_value, is_encrypted, mask_token
 
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# TOKEN CACHE
+# =============================================================================
+# Every LinkedIn API call resolves its token by URN, so decrypted rows are kept
+# in a small process-local cache instead of querying the database each time.
+# An entry never outlives the token itself (minus the caller's refresh buffer),
+# and every write or delete in this module drops the affected entries. Code that
+# changes the accounts table directly must call invalidate_token_cache().
+# Only touched from the event loop, so no lock is needed.
+
+TOKEN_CACHE_MAX_ENTRIES = 4096
+TOKEN_CACHE_TTL_SECONDS = 300
+
+_token_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _token_cache_get(linkedin_user_urn: str):
+    """Return the cached token row for a URN, or None if missing or stale."""
+    entry = _token_cache.get(linkedin_user_urn)
+    if entry is None:
+        return None
+    cached_until, token_row = entry
+    if cached_until <= time.time():
+        _token_cache.pop(linkedin_user_urn, None)
+        return None
+    return token_row
+
+
+def _token_cache_put(linkedin_user_urn: str, token_row: dict, refresh_buffer: int) -> None:
+    """Cache a token row until it expires (minus the buffer), at most TOKEN_CACHE_TTL_SECONDS."""
+    now = int(time.time())
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    expires_at = token_row.get('expires_at')
+    if expires_at:
+        ttl = min(expires_at - now - refresh_buffer, ttl)
+    if ttl <= 0:
+        return
+    _token_cache[linkedin_user_urn] = (now + ttl, token_row)
+    _token_cache.move_to_end(linkedin_user_urn)
+    while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
+
+
+def invalidate_token_cache(linkedin_user_urn: str = None, user_id: str = None) -> None:
+    """
+    Drop cached token rows for a LinkedIn URN and/or a Clerk user ID.
+    
+    Args:
+        linkedin_user_urn: URN whose cached row should be dropped
+        user_id: Drop every cached row belonging to this user
+    """
+    if linkedin_user_urn:
+        _token_cache.pop(linkedin_user_urn, None)
+    if user_id:
+        for urn, (_, token_row) in list(_token_cache.items()):
+            if token_row.get('user_id') == user_id:
+                _token_cache.pop(urn, None)
+
+
 async def save_token(
     linkedin_user_urn: str, 
     access_token: str, 
@@ -102,6 +163,7 @@ async def save_token(
                 WHERE user_id = $6
             """, [linkedin_user_urn, encrypted_access, encrypted_refresh, 
                   expires_at, scopes, user_id])
+            invalidate_token_cache(linkedin_user_urn, user_id)
             return
     
     # Insert new record or update if linkedin_urn conflicts
@@ -122,6 +184,7 @@ async def save_token(
         linkedin_user_urn, encrypted_access, encrypted_refresh, expires_at,
         user_id, github_username, encrypted_github, scopes
     ])
+    invalidate_token_cache(linkedin_user_urn, user_id)
 
 
 def _process_token_row(row) -> dict:
@@ -173,6 +236,25 @@ async def get_token_by_urn(linkedin_user_urn: str) -> dict | None:
     return _process_token_row(row)
 
 
+async def get_token_by_urn_cached(linkedin_user_urn: str, refresh_buffer: int = 60) -> dict | None:
+    """
+    Like get_token_by_urn, but served from the in-memory token cache when possible.
+    
+    Args:
+        linkedin_user_urn: The LinkedIn person URN to look up
+        refresh_buffer: Seconds before expiry after which a row is not cached
+        
+    Returns:
+        Dict with decrypted token data if found, None otherwise
+    """
+    token_row = _token_cache_get(linkedin_user_urn)
+    if token_row is None:
+        token_row = await get_token_by_urn(linkedin_user_urn)
+        if token_row:
+            _token_cache_put(linkedin_user_urn, token_row, refresh_buffer)
+    return token_row
+
+
 async def get_token_by_user_id(user_id: str) -> dict | None:
     """
     Retrieve a token by Clerk user ID with automatic decryption.
@@ -285,6 +367,7 @@ async def save_github_token(user_id: str, github_username: str, github_access_to
             VALUES ($1, $2, $3, 1)
         """, [user_id, github_username, encrypted_github])
     
+    invalidate_token_cache(user_id=user_id)
     return True
 
 
@@ -311,6 +394,7 @@ async def delete_token_by_user_id(user_id: str) -> bool:
             "DELETE FROM accounts WHERE user_id = $1", 
             [user_id]
         )
+        invalidate_token_cache(user_id=user_id)
         # result is the number of rows affected
         return result > 0 if isinstance(result, int) else True
     except Exception as e:
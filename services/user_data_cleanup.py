@@ -20,6 +20,7 @@ GDPR COMPLIANCE:
 
 import logging
 from services.db import get_database
+from services.token_store import invalidate_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,7 @@ async def delete_user_tokens(user_id: str) -> int:
             "DELETE FROM accounts WHERE user_id = :p1", 
             [user_id]
         )
+        invalidate_token_cache(user_id=user_id)
         deleted = result if isinstance(result, int) else 1
         logger.info(f"🗑️  Deleted {deleted} token record(s) for user {user_id[:8]}...")
         return deleted